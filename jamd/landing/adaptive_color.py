@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+
+from mask_geometry import contour_detection, largest_contour
+from pad_detector import PadDetector
+
+HUE_SAT_RANGES = [0, 180, 0, 256]
+
+
+# PadDetector that keeps working when the sunlight changes. Once the fixed
+# color thresholds lock onto the pad, a hue/saturation histogram of the pad
+# pixels is learned, and later frames are matched with calcBackProject inside
+# the tracking window only. The histogram keeps adapting at learning_rate while
+# the pad is tracked, from the pixels of the tracked blob only; if the window
+# loses the pad, or the pad is reset (e.g. rejected by a fiducial check), the
+# histogram is dropped and detection falls back to the fixed thresholds. Each
+# relock learns a fresh histogram, so colors of a rejected blob never linger.
+class AdaptivePadDetector(PadDetector):
+
+    def __init__(self, color, bins=(30, 32), threshold=40, learning_rate=0.05, **kwargs):
+        super().__init__(color, **kwargs)
+        self.bins = list(bins)
+        self.threshold = threshold  # Back-projection score (0-255) a pad pixel needs
+        self.learning_rate = learning_rate
+        self.hist = None
+        self.backproject_searches = 0
+        self.relocks = 0
+
+    def learn(self, hsv, mask):
+        hist = cv2.calcHist([hsv], [0, 1], mask, self.bins, HUE_SAT_RANGES)
+        # Spread each bin into its neighbours so a pad drifting into the next
+        # hue/saturation bin still scores high enough to be tracked and learned
+        hist = cv2.GaussianBlur(hist, (5, 5), 1)
+        if self.hist is not None:
+            hist = cv2.addWeighted(self.hist, 1 - self.learning_rate, hist, self.learning_rate, 0)
+        cv2.normalize(hist, hist, 0, 255, cv2.NORM_MINMAX)
+        self.hist = hist
+
+    def detect(self, frame):
+        if self.hist is not None and self.last is not None:
+            x0, y0, x1, y1 = self.roi(frame.shape)
+            self.backproject_searches += 1
+            hsv = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2HSV)
+            prob = cv2.calcBackProject([hsv], [0, 1], self.hist, HUE_SAT_RANGES, 1)
+            cv2.threshold(prob, self.threshold, 255, cv2.THRESH_BINARY, dst=prob)
+            contour, area = largest_contour(prob, self.min_area)
+            if contour is not None:
+                if self.learning_rate:
+                    # Only the tracked blob, not everything in the window that matched
+                    blob = np.zeros_like(prob)
+                    cv2.drawContours(blob, [contour], -1, 255, cv2.FILLED)
+                    self.learn(hsv, cv2.bitwise_and(prob, blob))
+                detection = contour_detection(contour + (x0, y0), area)
+                self.last = detection
+                return detection
+            self.hist = None
+
+        detection = super().detect(frame)
+        if detection is not None:
+            # Learn from the pixels the fixed thresholds accepted inside the pad
+            x, y, w, h = detection.x, detection.y, detection.w, detection.h
+            roi = frame[y:y + h, x:x + w]
+            self.hist = None  # Start over rather than blend into an older lock
+            self.learn(cv2.cvtColor(roi, cv2.COLOR_BGR2HSV), self.color_threshold.mask(roi))
+            self.relocks += 1
+        return detection
+
+    def reset(self):
+        super().reset()
+        self.hist = None
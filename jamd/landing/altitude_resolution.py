@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+# Picks the capture resolution for the current altitude. High up the pad is
+# only a few pixels across, so the camera runs at a high resolution with a
+# coarse-to-fine search; near touchdown the pad fills the frame and a small
+# resolution gives the highest frame rate for the final meters.
+#
+# Profiles are (min_altitude_m, width, height, coarse_scale). hysteresis keeps
+# altitude noise around a boundary from switching the camera back and forth.
+# Keep every profile at the calibrated aspect ratio: most sensors crop for
+# 16:9 modes, which changes the field of view, not just the pixel size, and
+# CameraModel.scaled() refuses such a switch.
+
+ResolutionProfile = namedtuple("ResolutionProfile", ["min_altitude", "width", "height", "coarse_scale"])
+
+DEFAULT_PROFILES = [
+    (8.0, 1280, 960, 0.25),
+    (3.0, 640, 480, None),
+    (0.0, 320, 240, None),
+]
+
+
+def vehicle_altitude(vehicle):
+    # Rangefinder first, it measures to the ground actually under the camera;
+    # relative altitude is the fallback when it has no reading
+    rangefinder = getattr(vehicle, "rangefinder", None)
+    if rangefinder is not None and rangefinder.distance:
+        return rangefinder.distance
+    location = vehicle.location.global_relative_frame
+    return location.alt if location is not None else None
+
+
+class ResolutionSchedule:
+
+    def __init__(self, profiles=DEFAULT_PROFILES, hysteresis=0.5):
+        self.profiles = sorted((ResolutionProfile(*p) for p in profiles),
+                               key=lambda p: p.min_altitude, reverse=True)
+        self.hysteresis = hysteresis
+        self.index = None
+        self.switches = 0
+
+    @property
+    def current(self):
+        return self.profiles[self.index] if self.index is not None else None
+
+    def select(self, altitude):
+        # Profile for this altitude. Unknown altitude keeps the current
+        # profile, or starts at the highest resolution
+        if altitude is None:
+            if self.index is None:
+                self.index = 0
+            return self.current
+
+        index = len(self.profiles) - 1
+        for i, profile in enumerate(self.profiles):
+            if altitude >= profile.min_altitude:
+                index = i
+                break
+
+        current = self.index
+        if current is not None and index != current:
+            climbing = index < current
+            if climbing and altitude < self.profiles[index].min_altitude + self.hysteresis:
+                index = current
+            elif not climbing and altitude > self.profiles[current].min_altitude - self.hysteresis:
+                index = current
+        if index != current:
+            if current is not None:
+                self.switches += 1
+            self.index = index
+        return self.current
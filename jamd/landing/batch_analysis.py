@@ -0,0 +1,152 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from color_lut import ColorThreshold
+
+# Offline analysis of recorded landing footage. Frames are decoded in chunks
+# and each chunk is thresholded and labelled in one go; the per-frame result
+# table can then be filtered for any tolerance / minimum area without
+# re-reading the video.
+#
+#   python batch_analysis.py flight.mp4 results.csv --workers 4
+
+RESULT_DTYPE = np.dtype([
+    ("frame", np.int32),
+    ("detected", np.uint8),
+    ("cx", np.int32), ("cy", np.int32),
+    ("x", np.int32), ("y", np.int32), ("w", np.int32), ("h", np.int32),
+    ("area", np.int32),  # Contour area of the largest blob, as landing_color.py
+    ("mask_pixels", np.int32),  # Pixel count of the whole mask
+])
+
+
+def read_chunks(path, chunk_size=16, start=0, stop=None):
+    # Yields (first_frame_index, frames) with frames shaped (n, h, w, 3)
+    cap = cv2.VideoCapture(path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    chunk = None
+    try:
+        while stop is None or index < stop:
+            n = chunk_size if stop is None else min(chunk_size, stop - index)
+            filled = 0
+            for i in range(n):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if chunk is None:
+                    chunk = np.empty((chunk_size,) + frame.shape, dtype=np.uint8)
+                chunk[i] = frame
+                filled += 1
+            if filled == 0:
+                break
+            yield index, chunk[:filled]
+            index += filled
+            if filled < n:
+                break
+    finally:
+        cap.release()
+
+
+def analyze_chunk(threshold, frames, first_index, min_area=0):
+    n, h, w = frames.shape[:3]
+
+    # Threshold the whole chunk as one tall image. Each frame gets an extra
+    # empty row underneath so blobs can't join across frame boundaries, then a
+    # single contour pass covers every frame at once.
+    masks = np.zeros((n, h + 1, w), dtype=np.uint8)
+    masks[:, :h] = threshold.mask(frames.reshape(n * h, w, 3)).reshape(n, h, w)
+    contours, _ = cv2.findContours(masks.reshape(n * (h + 1), w), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    result = np.zeros(n, dtype=RESULT_DTYPE)
+    result["frame"] = np.arange(first_index, first_index + n)
+    result["mask_pixels"] = np.count_nonzero(masks.reshape(n, -1), axis=1)
+    if not contours:
+        return result
+
+    areas = np.array([cv2.contourArea(c) for c in contours])
+    boxes = np.array([cv2.boundingRect(c) for c in contours]).reshape(-1, 4)
+    keep = areas > min_area
+    areas, boxes = areas[keep], boxes[keep]
+    if len(areas) == 0:
+        return result
+
+    # Largest blob per frame: sort by (frame, area) and keep the last of each frame
+    frame_of = boxes[:, 1] // (h + 1)
+    order = np.lexsort((areas, frame_of))
+    frame_of, areas, boxes = frame_of[order], areas[order], boxes[order]
+    last = np.r_[frame_of[1:] != frame_of[:-1], True]
+    frame_of, areas, boxes = frame_of[last], areas[last], boxes[last]
+
+    x = boxes[:, 0]
+    y = boxes[:, 1] - frame_of * (h + 1)
+    bw = boxes[:, 2]
+    bh = boxes[:, 3]
+    rows = result[frame_of]
+    rows["detected"] = 1
+    rows["x"], rows["y"], rows["w"], rows["h"] = x, y, bw, bh
+    rows["cx"], rows["cy"] = x + bw // 2, y + bh // 2  # Bounding box center, as landing_color.py
+    rows["area"] = areas
+    result[frame_of] = rows
+    return result
+
+
+def analyze_range(path, color, start=0, stop=None, chunk_size=16, min_area=0):
+    threshold = ColorThreshold(list(color))
+    parts = [analyze_chunk(threshold, frames, first, min_area)
+             for first, frames in read_chunks(path, chunk_size, start, stop)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=RESULT_DTYPE)
+
+
+def analyze_video(path, color=(255, 255, 0), workers=1, chunk_size=16, min_area=0):
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    if workers <= 1 or total <= 0:
+        return analyze_range(path, color, chunk_size=chunk_size, min_area=min_area)
+
+    # Each worker decodes its own contiguous slice of the video
+    bounds = np.linspace(0, total, workers + 1).astype(int)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_range, path, color, int(a), int(b), chunk_size, min_area)
+                   for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        parts = [f.result() for f in futures]
+    return np.concatenate(parts)
+
+
+def write_results(path, results):
+    if path.endswith(".npy"):
+        np.save(path, results)
+    else:
+        np.savetxt(path, results, fmt="%d", delimiter=",", header=",".join(RESULT_DTYPE.names), comments="")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch landing pad analysis of recorded video")
+    parser.add_argument("video")
+    parser.add_argument("output", help="result table, .csv or .npy")
+    parser.add_argument("--color", type=int, nargs=3, default=[255, 255, 0], metavar=("B", "G", "R"))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--min-area", type=int, default=0, help="ignore blobs this small (px²)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = analyze_video(args.video, args.color, args.workers, args.chunk_size, args.min_area)
+    write_results(args.output, results)
+    elapsed = time.perf_counter() - start
+
+    detected = int(results["detected"].sum())
+    print(f"[✓] {len(results)} frames, {detected} with a pad, {elapsed:.1f} s "
+          f"({len(results) / max(elapsed, 1e-9):.0f} frames/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
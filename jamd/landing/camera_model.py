@@ -0,0 +1,96 @@
+import math
+
+import cv2
+import numpy as np
+
+
+# Maps detector pixels to angles off the optical axis, taking lens distortion
+# into account. Every pixel is undistorted once at startup into a pair of
+# tan(angle) tables, so converting a detection costs two array lookups and no
+# frame is ever passed through cv2.undistort.
+#
+# Calibration files are the YAML written by OpenCV's calibration sample
+# (camera_matrix, distortion_coefficients, image_width, image_height) or an
+# .npz with the same keys.
+class CameraModel:
+
+    def __init__(self, camera_matrix, dist_coeffs, width, height, fisheye=False):
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64).reshape(3, 3)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64).ravel()
+        self.width = int(width)
+        self.height = int(height)
+        self.fisheye = fisheye
+        self.tan_x, self.tan_y = self._build_tables()
+
+    @classmethod
+    def from_fov(cls, width, height, hfov_deg, vfov_deg):
+        # Distortion-free pinhole model for when no calibration is available
+        fx = width / 2 / math.tan(math.radians(hfov_deg) / 2)
+        fy = height / 2 / math.tan(math.radians(vfov_deg) / 2)
+        camera_matrix = [[fx, 0, width / 2], [0, fy, height / 2], [0, 0, 1]]
+        return cls(camera_matrix, np.zeros(5), width, height)
+
+    @classmethod
+    def load(cls, path):
+        if path.endswith(".npz"):
+            data = np.load(path)
+            return cls(data["camera_matrix"], data["distortion_coefficients"],
+                       int(data["image_width"]), int(data["image_height"]),
+                       bool(data["fisheye"]) if "fisheye" in data else False)
+
+        fs = cv2.FileStorage(path, cv2.FILE_STORAGE_READ)
+        if not fs.isOpened():
+            raise FileNotFoundError(f"Cannot open calibration file {path}")
+        try:
+            fisheye = fs.getNode("fisheye")
+            return cls(fs.getNode("camera_matrix").mat(), fs.getNode("distortion_coefficients").mat(),
+                       int(fs.getNode("image_width").real()), int(fs.getNode("image_height").real()),
+                       bool(fisheye.real()) if not fisheye.empty() else False)
+        finally:
+            fs.release()
+
+    def scaled(self, width, height):
+        # Same lens at another capture resolution. Only valid for the same
+        # aspect ratio: a mode with another one is usually a sensor crop with
+        # a different field of view and needs its own calibration
+        sx, sy = width / self.width, height / self.height
+        if abs(sx / sy - 1) > 0.01:
+            raise ValueError(f"{width}x{height} has another aspect ratio than the {self.width}x{self.height} "
+                             f"calibration; calibrate that mode separately")
+        camera_matrix = self.camera_matrix.copy()
+        camera_matrix[0] *= sx
+        camera_matrix[1] *= sy
+        return CameraModel(camera_matrix, self.dist_coeffs, width, height, self.fisheye)
+
+    def _build_tables(self):
+        xs, ys = np.meshgrid(np.arange(self.width, dtype=np.float32), np.arange(self.height, dtype=np.float32))
+        pixels = np.stack([xs.ravel(), ys.ravel()], axis=-1).reshape(-1, 1, 2)
+        if self.fisheye:
+            normalized = cv2.fisheye.undistortPoints(pixels, self.camera_matrix, self.dist_coeffs)
+        else:
+            # More iterations than undistortPoints' default 5, which leaves
+            # visible error in the corners of wide-angle lenses
+            criteria = (cv2.TERM_CRITERIA_COUNT | cv2.TERM_CRITERIA_EPS, 40, 1e-7)
+            if hasattr(cv2, "undistortPointsIter"):
+                normalized = cv2.undistortPointsIter(pixels, self.camera_matrix, self.dist_coeffs, None, None, criteria)
+            else:
+                # OpenCV 5 folded the iterative version into undistortPoints
+                normalized = cv2.undistortPoints(pixels, self.camera_matrix, self.dist_coeffs,
+                                                 R=None, P=None, criteria=criteria)
+        normalized = normalized.reshape(self.height, self.width, 2)
+        return np.ascontiguousarray(normalized[..., 0]), np.ascontiguousarray(normalized[..., 1])
+
+    def _tan(self, cx, cy):
+        x = min(max(int(round(cx)), 0), self.width - 1)
+        y = min(max(int(round(cy)), 0), self.height - 1)
+        return float(self.tan_x[y, x]), float(self.tan_y[y, x])
+
+    def pixel_to_angle(self, cx, cy):
+        # Radians off the optical axis, +x right, +y down
+        tx, ty = self._tan(cx, cy)
+        return math.atan(tx), math.atan(ty)
+
+    def pixel_to_offset(self, cx, cy, distance):
+        # Metric offset (right, down in the image) on a plane `distance` away
+        tx, ty = self._tan(cx, cy)
+        return tx * distance, ty * distance
@@ -0,0 +1,128 @@
+import cv2
+import numpy as np
+
+HUE_TOLERANCE = 10
+MIN_SATURATION = 100
+MIN_VALUE = 100
+
+
+def get_limits(color, hue_tolerance=HUE_TOLERANCE):
+    # Returns a list of (lower, upper) HSV ranges. Hues near red wrap around
+    # 0/179, so those colors get two ranges instead of one clipped one.
+    c = np.uint8([[color]])  # BGR values
+    hue = int(cv2.cvtColor(c, cv2.COLOR_BGR2HSV)[0][0][0])
+
+    low, high = hue - hue_tolerance, hue + hue_tolerance
+    if low < 0:
+        hue_ranges = [(0, high), (180 + low, 179)]
+    elif high > 179:
+        hue_ranges = [(low, 179), (0, high - 180)]
+    else:
+        hue_ranges = [(low, high)]
+
+    return [(np.array([lo, MIN_SATURATION, MIN_VALUE], dtype=np.uint8),
+             np.array([hi, 255, 255], dtype=np.uint8)) for lo, hi in hue_ranges]
+
+
+def _all_bgr_colors():
+    # Every 24-bit color laid out as a BGR image, ordered so that the pixel at
+    # flat index i is b = i & 0xFF, g = (i >> 8) & 0xFF, r = i >> 16
+    packed = np.arange(1 << 24, dtype="<u4").view(np.uint8).reshape(4096, 4096, 4)
+    return np.ascontiguousarray(packed[..., :3])
+
+
+def _in_ranges(hsv, limits):
+    mask = cv2.inRange(hsv, *limits[0])
+    for lower, upper in limits[1:]:
+        cv2.bitwise_or(mask, cv2.inRange(hsv, lower, upper), dst=mask)
+    return mask
+
+
+# Color threshold on a BGR frame: cvtColor to HSV, then inRange over the
+# color's ranges. This is what the detectors use.
+class ColorThreshold:
+
+    def __init__(self, color=None, hue_tolerance=HUE_TOLERANCE, limits=None):
+        # limits: optional list of (lower, upper) HSV pairs used instead of color
+        if limits is None:
+            limits = get_limits(color, hue_tolerance)
+        self.color = color
+        self.limits = [(np.asarray(lo, dtype=np.uint8), np.asarray(hi, dtype=np.uint8)) for lo, hi in limits]
+
+    def mask(self, frame):
+        return _in_ranges(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV), self.limits)
+
+
+# The same threshold compiled into a BGR -> mask lookup table: the HSV
+# conversion and range test run once for all 2^24 colors when the table is
+# built. Measured on x86 it is slower than ColorThreshold (the BGRA pack
+# alone costs about as much as the HSV conversion, then every pixel reads
+# at random from a 16 MB table), so nothing uses it by default; it is kept
+# for landing_bench.py --mode lut, to compare on other boards.
+class ColorLUT(ColorThreshold):
+
+    def __init__(self, color=None, hue_tolerance=HUE_TOLERANCE, limits=None):
+        super().__init__(color, hue_tolerance, limits)
+        self._index = None
+        self._mask = None
+        self.table = self._build_table()
+
+    def _build_table(self):
+        return _in_ranges(cv2.cvtColor(_all_bgr_colors(), cv2.COLOR_BGR2HSV), self.limits).ravel()
+
+    def pack(self, frame):
+        # BGR -> BGRA is a cheap SIMD pass in OpenCV and lets each pixel be read
+        # as one little-endian uint32; dropping alpha leaves the table index
+        h, w = frame.shape[:2]
+        if self._index is None or self._index.size < h * w:
+            self._index = np.empty(h * w, dtype=np.uint32)
+            self._mask = np.empty(h * w, dtype=np.uint8)
+        index = self._index[:h * w].reshape(h, w)
+        bgra = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+        np.bitwise_and(bgra.view("<u4")[..., 0], 0xFFFFFF, out=index)
+        return index
+
+    def lookup(self, index):
+        # The returned mask is reused by the next call; copy it to keep it
+        return self.table.take(index, out=self._mask[:index.size].reshape(index.shape))
+
+    def mask(self, frame):
+        return self.lookup(self.pack(frame))
+
+
+# Several colors labelled in one image: 0 for background, i + 1 for
+# colors[i], from one HSV conversion. Where ranges overlap the earlier color
+# wins.
+class MultiColorThreshold(ColorThreshold):
+
+    def __init__(self, colors, hue_tolerance=HUE_TOLERANCE):
+        if len(colors) > 255:
+            raise ValueError("At most 255 colors fit in a uint8 label image")
+        self.colors = list(colors)
+        self.color_limits = [get_limits(color, hue_tolerance) for color in self.colors]
+        super().__init__(limits=[limits for color_limits in self.color_limits for limits in color_limits])
+
+    def mask(self, frame):
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        labels = np.zeros(hsv.shape[:2], dtype=np.uint8)
+        for label, limits in reversed(list(enumerate(self.color_limits, start=1))):
+            labels[_in_ranges(hsv, limits) > 0] = label
+        return labels
+
+
+# MultiColorThreshold as a lookup table, see ColorLUT
+class MultiColorLUT(ColorLUT):
+
+    def __init__(self, colors, hue_tolerance=HUE_TOLERANCE):
+        if len(colors) > 255:
+            raise ValueError("At most 255 colors fit in a uint8 label table")
+        self.colors = list(colors)
+        self.color_limits = [get_limits(color, hue_tolerance) for color in self.colors]
+        super().__init__(limits=[limits for color_limits in self.color_limits for limits in color_limits])
+
+    def _build_table(self):
+        hsv = cv2.cvtColor(_all_bgr_colors(), cv2.COLOR_BGR2HSV)
+        table = np.zeros(hsv.shape[:2], dtype=np.uint8)
+        for label, limits in reversed(list(enumerate(self.color_limits, start=1))):
+            table[_in_ranges(hsv, limits) > 0] = label
+        return table.ravel()
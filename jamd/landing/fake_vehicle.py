@@ -0,0 +1,49 @@
+import math
+import sys
+import time
+
+from pymavlink import mavutil
+
+# Stand-in autopilot for bench testing the landing detector without hardware.
+# Listens like SITL does, sends heartbeats once a client connects and prints
+# the LANDING_TARGET messages it receives.
+#
+#   python fake_vehicle.py [tcpin:127.0.0.1:5760]
+#   (then set mavlink_connection = "tcp:127.0.0.1:5760" in landing_color.py)
+
+DEFAULT_ENDPOINT = "tcpin:127.0.0.1:5760"
+
+
+def run(endpoint=DEFAULT_ENDPOINT):
+    conn = mavutil.mavlink_connection(endpoint, source_system=1, source_component=1)
+    print(f"[✓] Fake vehicle listening on {endpoint}")
+
+    last_heartbeat = 0.0
+    received = 0
+    window_start = time.monotonic()
+
+    while True:
+        now = time.monotonic()
+        if now - last_heartbeat >= 1.0:
+            conn.mav.heartbeat_send(mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                                    mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                                    0, 0, mavutil.mavlink.MAV_STATE_ACTIVE)
+            last_heartbeat = now
+
+        msg = conn.recv_match(type="LANDING_TARGET", blocking=True, timeout=0.2)
+        if msg is None:
+            continue
+
+        received += 1
+        print(f"LANDING_TARGET: angle_x={math.degrees(msg.angle_x):+.2f}°, "
+              f"angle_y={math.degrees(msg.angle_y):+.2f}°, distance={msg.distance:.2f}")
+
+        elapsed = time.monotonic() - window_start
+        if elapsed >= 5.0:
+            print(f"[i] {received / elapsed:.1f} LANDING_TARGET msg/s")
+            received = 0
+            window_start = time.monotonic()
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ENDPOINT)
@@ -0,0 +1,75 @@
+import math
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Second stage for the color detector: decode an ArUco/AprilTag marker printed
+# on the pad, searching only inside the color blob's bounding box. A blob with
+# no marker (a cyan car roof, a tarp...) is rejected, and a confirmed pad also
+# gives its yaw. Decoding a small crop costs a fraction of a full-frame marker
+# search.
+
+FiducialCheck = namedtuple("FiducialCheck", ["marker_id", "yaw", "corners"])
+
+
+class FiducialVerifier:
+
+    def __init__(self, dictionary=None, marker_ids=None, padding=0.2, min_side=64):
+        # dictionary defaults to DICT_APRILTAG_36h11. It is looked up here, not
+        # in the signature, so importing this module works without cv2.aruco
+        if dictionary is None:
+            dictionary = cv2.aruco.DICT_APRILTAG_36h11
+        self.dictionary = cv2.aruco.getPredefinedDictionary(dictionary)
+        self.marker_ids = set(marker_ids) if marker_ids is not None else None  # None accepts any id
+        self.padding = padding  # Crop padding as a fraction of the blob size
+        self.min_side = min_side  # Smaller crops are upscaled so the marker bits stay decodable
+
+        if hasattr(cv2.aruco, "ArucoDetector"):
+            self._detector = cv2.aruco.ArucoDetector(self.dictionary, cv2.aruco.DetectorParameters())
+        else:
+            # OpenCV < 4.7
+            self._detector = None
+            self._parameters = cv2.aruco.DetectorParameters_create()
+
+        self.checked = 0
+        self.rejected = 0
+
+    def _detect_markers(self, gray):
+        if self._detector is not None:
+            corners, ids, _ = self._detector.detectMarkers(gray)
+        else:
+            corners, ids, _ = cv2.aruco.detectMarkers(gray, self.dictionary, parameters=self._parameters)
+        return corners, ids
+
+    def verify(self, frame, detection):
+        # FiducialCheck for the marker inside the detection, or None to reject it
+        self.checked += 1
+        h, w = frame.shape[:2]
+        pad_x, pad_y = int(detection.w * self.padding), int(detection.h * self.padding)
+        x0, y0 = max(detection.x - pad_x, 0), max(detection.y - pad_y, 0)
+        x1, y1 = min(detection.x + detection.w + pad_x, w), min(detection.y + detection.h + pad_y, h)
+        gray = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+
+        scale = 1.0
+        side = min(gray.shape[:2])
+        if 0 < side < self.min_side:
+            scale = self.min_side / side
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+
+        corners, ids = self._detect_markers(gray)
+        if ids is not None:
+            for marker_corners, marker_id in zip(corners, ids.ravel()):
+                if self.marker_ids is not None and int(marker_id) not in self.marker_ids:
+                    continue
+                points = marker_corners.reshape(4, 2) / scale + (x0, y0)
+                # Yaw of the marker's top edge against the image x axis, +clockwise
+                dx, dy = points[1] - points[0]
+                return FiducialCheck(int(marker_id), math.atan2(dy, dx), points.astype(np.float32))
+
+        self.rejected += 1
+        return None
+
+    @property
+    def rejection_rate(self):
+        return self.rejected / self.checked if self.checked else 0.0
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+# Reads a camera on its own thread and keeps only the newest frame, so a slow
+# detection pass never lets the driver buffer back up. Frames that are replaced
+# before anyone reads them are counted in `dropped`.
+#
+# A recorded video file is replayed instead: every frame is decoded only once
+# the previous one has been read, so none are dropped and a replay runs at
+# the speed of the loop reading it. Pass replay=True/False to override the
+# guess made from the source being an existing file.
+#
+# request_resolution() changes the camera mode from the capture thread between
+# two reads, so the switch never races a cap.read() in progress. Consumers see
+# it as frames of the new shape. Each switch records how many frame periods
+# the camera went quiet for (`switch_losses`), so the cost of switching can be
+# checked against the camera's normal frame rate.
+class LatestFrameCapture:
+
+    def __init__(self, source=0, width=None, height=None, replay=None):
+        self.cap = cv2.VideoCapture(source)
+        self.replay = isinstance(source, str) and os.path.isfile(source) if replay is None else replay
+        if width and height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # ignored by backends that can't do it
+
+        self.captured = 0
+        self.dropped = 0
+        self.running = False
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._captured_at = 0.0
+        self._seq = 0
+        self._read_seq = 0
+        self._thread = None
+        self._requested_size = None
+        self.resolution_switches = 0
+        self.switch_losses = []  # Frames lost to each resolution switch
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def request_resolution(self, width, height):
+        with self._cond:
+            self._requested_size = (width, height)
+
+    def _apply_requested_size(self):
+        with self._cond:
+            size, self._requested_size = self._requested_size, None
+        if size is None:
+            return
+        width, height = size
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.resolution_switches += 1
+
+    def _run(self):
+        last_at = None
+        interval = None  # Smoothed time between frames
+        switched = False
+        while self.running:
+            if self.replay:
+                with self._cond:
+                    # Hold the next frame back until this one has been read
+                    self._cond.wait_for(lambda: self._seq == self._read_seq or not self.running, 0.1)
+                    if self._seq != self._read_seq:
+                        continue
+            if self._requested_size is not None:
+                self._apply_requested_size()
+                switched = True
+            ret, frame = self.cap.read()
+            captured_at = time.monotonic()
+            if ret and last_at is not None:
+                gap = captured_at - last_at
+                if switched:
+                    # Frame periods with no frame while the camera changed mode
+                    self.switch_losses.append(max(round(gap / interval) - 1, 0) if interval else 0)
+                else:
+                    interval = gap if interval is None else 0.9 * interval + 0.1 * gap
+            if ret:
+                last_at = captured_at
+                switched = False
+            with self._cond:
+                if not ret:
+                    self.running = False
+                    self._cond.notify_all()
+                    break
+                if self._seq != self._read_seq:
+                    self.dropped += 1
+                self._frame = frame
+                self._captured_at = captured_at
+                self._seq += 1
+                self.captured += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=1.0):
+        # Returns (seq, captured_at, frame) for the newest unseen frame, or None
+        # on timeout or once the source has ended. captured_at is time.monotonic()
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != self._read_seq or not self.running, timeout)
+            if self._seq == self._read_seq:
+                return None
+            self._read_seq = self._seq
+            self._cond.notify_all()
+            return self._seq, self._captured_at, self._frame
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.cap.release()
+
+
+# Rolling capture-to-decision latency over the last `window` frames
+class LatencyMeter:
+
+    def __init__(self, window=100):
+        self.samples = deque(maxlen=window)
+
+    def add(self, captured_at):
+        latency = time.monotonic() - captured_at
+        self.samples.append(latency)
+        return latency
+
+    def summary(self):
+        if not self.samples:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "max_ms": 0.0}
+        ms = np.array(self.samples) * 1000
+        return {"mean_ms": float(ms.mean()), "p50_ms": float(np.median(ms)), "max_ms": float(ms.max())}
@@ -0,0 +1,44 @@
+import time
+
+from frame_capture import LatestFrameCapture
+from frame_ring import DEFAULT_NAME, FrameRing
+
+# Owns the camera and publishes every frame into a shared-memory FrameRing, so
+# the landing detector (frame_ring_name in landing_color.py), the GUI video
+# view (frame_ring_name in gui_start.py) and frame_recorder.py can all use one
+# capture without re-decoding or pickling frames.
+
+# --- Settings ---
+video_source = 0
+frame_width, frame_height = 640, 480
+ring_name = DEFAULT_NAME
+ring_slots = 8
+stats_every = 5.0  # Seconds between stats lines
+
+# --- Init ---
+capture = LatestFrameCapture(video_source, frame_width, frame_height).start()
+first = capture.read(timeout=5)
+if first is None:
+    raise RuntimeError(f"No frames from video source {video_source}")
+
+ring = FrameRing.create(first[2].shape, name=ring_name, slots=ring_slots)
+print(f"[✓] Publishing {first[2].shape[1]}x{first[2].shape[0]} frames to '{ring.name}'")
+
+item = first
+last_stats = time.monotonic()
+try:
+    while capture.running or item is not None:
+        if item is not None:
+            seq, captured_at, frame = item
+            ring.publish(frame, captured_at)
+
+        now = time.monotonic()
+        if now - last_stats >= stats_every:
+            print(f"Published {ring.latest_seq} frames, capture dropped {capture.dropped}")
+            last_stats = now
+        item = capture.read()
+except KeyboardInterrupt:
+    pass
+finally:
+    capture.stop()
+    ring.close()
@@ -0,0 +1,37 @@
+import sys
+
+import cv2
+
+from frame_ring import DEFAULT_NAME, FrameRing
+
+# Records frames published by frame_publisher.py to a video file. Reads frames
+# in order and only skips the ones the publisher already overwrote, so a slow
+# disk never holds up the camera or the other consumers.
+#
+#   python frame_recorder.py flight.avi [ring name]
+
+# --- Settings ---
+fps = 30.0
+fourcc = "MJPG"
+
+output = sys.argv[1] if len(sys.argv) > 1 else "flight.avi"
+ring = FrameRing.attach(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_NAME)
+reader = ring.reader()
+height, width = ring.shape[:2]
+writer = cv2.VideoWriter(output, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+print(f"[✓] Recording '{ring.name}' to {output}")
+
+try:
+    while True:
+        item = reader.next(timeout=5.0)
+        if item is None:
+            print("No frames for 5 s, stopping.")
+            break
+        writer.write(item[2])
+except KeyboardInterrupt:
+    pass
+finally:
+    writer.release()
+    print(f"Recorded {reader.received} frames, skipped {reader.skipped}")
+    reader = None
+    ring.close()
@@ -0,0 +1,211 @@
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Single-producer, multi-consumer ring of camera frames in shared memory.
+# One capture process publishes frames; the landing detector, the GUI video
+# view and a recorder each attach by name and read at their own pace. The
+# producer never waits for anyone: a consumer that falls more than `slots`
+# frames behind just skips ahead.
+#
+# Every slot carries the sequence number of the frame in it. The producer sets
+# it to -1 while overwriting the slot, so a reader can check the number before
+# and after reading to know the frame it got is intact.
+
+DEFAULT_NAME = "jamd_frames"
+_MAGIC = 0x4A414D44  # "JAMD"
+_FIXED_FIELDS = 6  # magic, slots, height, width, channels, latest
+
+
+class FrameRing:
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        header = np.ndarray((_FIXED_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if owner:
+            return
+        if header[0] != _MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory {shm.name} is not a frame ring")
+        self._map(int(header[1]), tuple(int(v) for v in header[2:5]))
+
+    def _map(self, slots, shape):
+        self.slots = slots
+        self.shape = shape
+        buf = self.shm.buf
+        self.header = np.ndarray((_FIXED_FIELDS,), dtype=np.int64, buffer=buf)
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=8 * _FIXED_FIELDS)
+        self.stamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=8 * (_FIXED_FIELDS + slots))
+        self.frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=buf,
+                                 offset=self.header_bytes(slots))
+
+    @staticmethod
+    def header_bytes(slots):
+        return 8 * (_FIXED_FIELDS + 2 * slots)
+
+    @classmethod
+    def create(cls, shape, name=DEFAULT_NAME, slots=8):
+        # name=None picks a unique name, read it back from ring.name
+        shape = tuple(int(v) for v in shape)
+        if len(shape) == 2:
+            shape += (1,)
+        size = cls.header_bytes(slots) + slots * int(np.prod(shape))
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a producer that didn't shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        ring = cls(shm, owner=True)
+        ring._map(slots, shape)
+        ring.seqs[:] = 0
+        ring.header[1:5] = (slots,) + shape
+        ring.header[5] = 0
+        ring.header[0] = _MAGIC  # Written last: attaching before this fails cleanly
+        return ring
+
+    @classmethod
+    def attach(cls, name=DEFAULT_NAME, track=False):
+        # track=False keeps Python's resource tracker from unlinking the ring
+        # when this consumer exits (it only should for the owner). Worker
+        # processes started by the owner share its tracker and pass track=True.
+        shm = shared_memory.SharedMemory(name=name)
+        if not track and os.name == "posix":
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def latest_seq(self):
+        return int(self.header[5])
+
+    def publish(self, frame, captured_at=None):
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        self.seqs[slot] = -1
+        self.frames[slot] = frame.reshape(self.shape)
+        self.stamps[slot] = time.monotonic() if captured_at is None else captured_at
+        self.seqs[slot] = seq
+        self.header[5] = seq
+        return seq
+
+    def reader(self, copy=True):
+        return FrameRingReader(self, copy)
+
+    def close(self):
+        # Drop our views first, SharedMemory.close() refuses while they exist
+        for attr in ("header", "seqs", "stamps", "frames"):
+            self.__dict__.pop(attr, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# One consumer's cursor into a FrameRing. latest() jumps to the newest frame
+# (detector, GUI); next() returns frames in order and only skips the ones that
+# were already overwritten (recorder). Both count skipped frames.
+#
+# With copy=True the frame is copied into a buffer that the next read reuses.
+# With copy=False, frames are returned as views into the ring; call
+# still_valid(seq) after using one to check it wasn't overwritten meanwhile.
+class FrameRingReader:
+
+    def __init__(self, ring, copy=True):
+        self.ring = ring
+        self.copy = copy
+        self.seq = ring.latest_seq
+        self.received = 0
+        self.skipped = 0
+        self._buffer = np.empty(ring.shape, dtype=np.uint8) if copy else None
+
+    def _wait_for(self, seq, timeout):
+        deadline = time.monotonic() + timeout
+        while self.ring.latest_seq < seq:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def _fetch(self, seq):
+        ring = self.ring
+        slot = seq % ring.slots
+        if ring.seqs[slot] != seq:
+            return None
+        captured_at = float(ring.stamps[slot])
+        frame = ring.frames[slot]
+        if self.copy:
+            np.copyto(self._buffer, frame)
+            frame = self._buffer
+        if ring.seqs[slot] != seq:
+            return None
+        return seq, captured_at, frame
+
+    def _take(self, seq):
+        item = self._fetch(seq)
+        if item is None:
+            return None
+        self.skipped += seq - self.seq - 1
+        self.seq = seq
+        self.received += 1
+        return item
+
+    def latest(self, timeout=1.0):
+        # Newest frame after the cursor as (seq, captured_at, frame), or None
+        while self._wait_for(self.seq + 1, timeout):
+            item = self._take(self.ring.latest_seq)
+            if item is not None:
+                return item
+        return None
+
+    def next(self, timeout=1.0):
+        # Frame right after the cursor, or the oldest one still in the ring.
+        # If the producer overwrites that one while it is being read, the
+        # seq check in _fetch() notices and the loop moves on to the new oldest
+        while self._wait_for(self.seq + 1, timeout):
+            oldest = self.ring.latest_seq - self.ring.slots + 1
+            item = self._take(max(self.seq + 1, oldest))
+            if item is not None:
+                return item
+        return None
+
+    def still_valid(self, seq):
+        return self.ring.seqs[seq % self.ring.slots] == seq
+
+
+# Drop-in for LatestFrameCapture that reads from a ring published by another
+# process instead of opening the camera itself
+class RingCapture:
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.ring = FrameRing.attach(name)
+        self.reader = self.ring.reader()
+        self.running = False
+
+    def start(self):
+        self.running = True
+        return self
+
+    @property
+    def captured(self):
+        return self.reader.received + self.reader.skipped
+
+    @property
+    def dropped(self):
+        return self.reader.skipped
+
+    def read(self, timeout=1.0):
+        return self.reader.latest(timeout)
+
+    def stop(self):
+        self.running = False
+        self.reader = None
+        self.ring.close()
@@ -0,0 +1,223 @@
+import argparse
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from color_lut import ColorLUT, ColorThreshold
+from mask_geometry import mask_bbox
+from pad_detector import MIN_AREA, PadDetector
+
+# Headless benchmark for the landing detectors. Runs the per-frame pipeline of
+# landing_color.py or sticky_note.py on a recorded video or synthetic frames,
+# skips all drawing and prints per-stage timings as JSON.
+#
+# --detector pad drives PadDetector itself, the code landing_color.py runs,
+# with its ROI tracking and coarse search, and also reports latency per
+# search path (window hit, window miss, full frame).
+#
+#   python landing_bench.py --video flight.mp4
+#   python landing_bench.py --synthetic 500 --width 1920 --height 1080 --mode hsv
+#   python landing_bench.py --synthetic 500 --width 1920 --height 1080 --detector pad --coarse-scale 0.25
+
+STAGES = ["capture", "color_convert", "threshold", "contours", "centroid"]
+PAD_STAGES = ["capture", "threshold", "blobs"]
+
+
+def synthetic_frames(count, width=640, height=480, color=(255, 255, 0), pad_size=60, seed=0):
+    # Noisy ground with a pad drifting across it; the background is rendered
+    # once so generating a frame costs about one copy
+    rng = np.random.default_rng(seed)
+    ground = rng.integers(40, 120, (height, width, 3), dtype=np.uint8)
+    ground = cv2.GaussianBlur(ground, (7, 7), 0)
+    for i in range(count):
+        frame = ground.copy()
+        t = i / max(count - 1, 1)
+        x = int((width - pad_size) * (0.1 + 0.8 * t))
+        y = int((height - pad_size) * (0.5 + 0.4 * np.sin(6 * t)))
+        cv2.rectangle(frame, (x, y), (x + pad_size, y + pad_size), color, -1)
+        yield frame
+
+
+def video_frames(path):
+    cap = cv2.VideoCapture(path)
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def run(frames, color=(255, 255, 0), mode="hsv", detector="landing", min_area=MIN_AREA):
+    # mode "lut" times the lookup table, which the detectors don't use (see color_lut.py)
+    lut = ColorLUT(list(color)) if mode == "lut" else ColorThreshold(list(color))
+    timings = {stage: [] for stage in STAGES}
+    totals = []
+    detections = 0
+
+    frames = iter(frames)
+    wall_start = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        frame = next(frames, None)
+        if frame is None:
+            break
+        t1 = time.perf_counter()
+
+        if mode == "lut":
+            index = lut.pack(frame)
+            t2 = time.perf_counter()
+            mask = lut.lookup(index)
+        else:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+            t2 = time.perf_counter()
+            mask = cv2.inRange(hsv, *lut.limits[0])
+            for lower, upper in lut.limits[1:]:
+                mask |= cv2.inRange(hsv, lower, upper)
+        t3 = time.perf_counter()
+
+        centroid = None
+        if detector == "sticky":
+            bbox = mask_bbox(mask)
+            t4 = time.perf_counter()
+            if bbox is not None:
+                x1, y1, x2, y2 = bbox
+                centroid = ((x1 + x2) // 2, (y1 + y2) // 2)
+        else:
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            t4 = time.perf_counter()
+            if contours:
+                largest = max(contours, key=cv2.contourArea)
+                if cv2.contourArea(largest) > min_area:
+                    x, y, w, h = cv2.boundingRect(largest)
+                    centroid = (x + w // 2, y + h // 2)
+        t5 = time.perf_counter()
+
+        if centroid is not None:
+            detections += 1
+        for stage, start, end in zip(STAGES, (t0, t1, t2, t3, t4), (t1, t2, t3, t4, t5)):
+            timings[stage].append(end - start)
+        totals.append(t5 - t0)
+
+    wall = time.perf_counter() - wall_start
+    return summarize(timings, totals, detections, wall, mode, detector)
+
+
+def run_pad(frames, color=(255, 255, 0), min_area=MIN_AREA, tracking=True, coarse_scale=None):
+    detector = PadDetector(list(color), min_area, tracking=tracking, coarse_scale=coarse_scale)
+    # Time every mask the detector thresholds (window, full frame or coarse
+    # copy); the rest of detect() is blob extraction and bookkeeping
+    mask = detector.color_threshold.mask
+    spent = [0.0]
+
+    def timed_mask(image):
+        start = time.perf_counter()
+        result = mask(image)
+        spent[0] += time.perf_counter() - start
+        return result
+
+    detector.color_threshold.mask = timed_mask
+
+    timings = {stage: [] for stage in PAD_STAGES}
+    paths = {"roi_hit": [], "roi_miss": [], "full": []}
+    totals = []
+    detections = 0
+
+    frames = iter(frames)
+    wall_start = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        frame = next(frames, None)
+        if frame is None:
+            break
+        t1 = time.perf_counter()
+        spent[0] = 0.0
+        roi_searches, roi_misses = detector.roi_searches, detector.roi_misses
+        detection = detector.detect(frame)
+        t2 = time.perf_counter()
+
+        if detection is not None:
+            detections += 1
+        timings["capture"].append(t1 - t0)
+        timings["threshold"].append(spent[0])
+        timings["blobs"].append(t2 - t1 - spent[0])
+        if detector.roi_misses > roi_misses:
+            paths["roi_miss"].append(t2 - t1)
+        elif detector.roi_searches > roi_searches:
+            paths["roi_hit"].append(t2 - t1)
+        else:
+            paths["full"].append(t2 - t1)
+        totals.append(t2 - t0)
+
+    wall = time.perf_counter() - wall_start
+    mode = f"coarse {coarse_scale}" if coarse_scale else "full"
+    result = summarize(timings, totals, detections, wall, mode, "pad")
+    result["tracking"] = tracking
+    result["paths"] = {path: dict(frames=len(samples), **_percentiles(samples)) for path, samples in paths.items()}
+    return result
+
+
+def _percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    if ms.size == 0:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+    return {"mean_ms": round(float(ms.mean()), 4),
+            "p50_ms": round(float(np.percentile(ms, 50)), 4),
+            "p99_ms": round(float(np.percentile(ms, 99)), 4)}
+
+
+def summarize(timings, totals, detections, wall, mode, detector):
+    frames = len(totals)
+    return {
+        "detector": detector,
+        "mode": mode,
+        "frames": frames,
+        "detections": detections,
+        "fps": round(frames / wall, 2) if wall > 0 else 0.0,
+        "latency": _percentiles(totals),
+        "stages": {stage: _percentiles(samples) for stage, samples in timings.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless landing detector benchmark")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="recorded video file to replay")
+    source.add_argument("--synthetic", type=int, metavar="N", help="generate N synthetic pad frames")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--color", type=int, nargs=3, default=[255, 255, 0], metavar=("B", "G", "R"))
+    parser.add_argument("--mode", choices=["hsv", "lut"], default="hsv", help="threshold via cvtColor+inRange or lookup table")
+    parser.add_argument("--detector", choices=["landing", "sticky", "pad"], default="landing",
+                        help="pad runs PadDetector as landing_color.py does; --mode is ignored")
+    parser.add_argument("--no-tracking", action="store_true", help="pad: search every frame in full")
+    parser.add_argument("--coarse-scale", type=float, help="pad: coarse search scale, e.g. 0.25")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.video:
+        frames = video_frames(args.video)
+    else:
+        frames = synthetic_frames(args.synthetic, args.width, args.height, tuple(args.color))
+
+    if args.detector == "pad":
+        result = run_pad(frames, args.color, tracking=not args.no_tracking, coarse_scale=args.coarse_scale)
+    else:
+        result = run(frames, args.color, args.mode, args.detector)
+    result["source"] = args.video or "synthetic"
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
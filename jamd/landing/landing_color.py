@@ -1,67 +1,173 @@
+import math
+import time
+
 import cv2
-import numpy as np
-from PIL import Image
-
-def get_limits(color):
-    c = np.uint8([[color]])  # BGR values
-    hsvC = cv2.cvtColor(c, cv2.COLOR_BGR2HSV)
-    hue = hsvC[0][0][0]
-
-    if hue >= 165:
-        lowerLimit = np.array([hue - 10, 100, 100], dtype=np.uint8)
-        upperLimit = np.array([180, 255, 255], dtype=np.uint8)
-    elif hue <= 15:
-        lowerLimit = np.array([0, 100, 100], dtype=np.uint8)
-        upperLimit = np.array([hue + 10, 255, 255], dtype=np.uint8)
-    else:
-        lowerLimit = np.array([hue - 10, 100, 100], dtype=np.uint8)
-        upperLimit = np.array([hue + 10, 255, 255], dtype=np.uint8)
-
-    return lowerLimit, upperLimit
+
+from adaptive_color import AdaptivePadDetector
+from altitude_resolution import ResolutionSchedule, vehicle_altitude
+from camera_model import CameraModel
+from frame_capture import LatestFrameCapture, LatencyMeter
+from fiducial_verify import FiducialVerifier
+from frame_ring import RingCapture
+from landing_target import LandingTargetSender
+from pad_detector import PadDetector
+from pad_tracker import PadTracker
 
 # --- Settings ---
+video_source = 0  # Camera index, or a recorded video path (replayed frame by frame, none dropped)
+frame_ring_name = None  # e.g. "jamd_frames" to read frames from frame_publisher.py instead
+show_view = True  # False on a headless companion computer
 landing_color = [255, 255, 0]  # Cyan pad in BGR
 frame_width, frame_height = 640, 480
+altitude_profiles = None  # e.g. altitude_resolution.DEFAULT_PROFILES to switch resolution with altitude (needs mavlink_connection)
 tolerance = 30  # How close to center before triggering descent
+tracking = True  # Search only around the last pad position once locked
+adaptive_color = False  # Learn the pad's hue/saturation once locked and follow it through lighting changes
+fiducial_dictionary = None  # e.g. cv2.aruco.DICT_APRILTAG_36h11 to confirm the pad by the marker printed on it
+predictive_tracking = True  # Kalman-smooth the pad and predict it at command time
+command_delay = 0.05  # Seconds from decision until the autopilot acts on a command
+coarse_scale = None  # e.g. 0.25 to search a downscaled frame first at high resolutions
+calibration_file = None  # OpenCV camera calibration (.yaml/.npz); None uses the FOV below
+horizontal_fov, vertical_fov = 62.2, 48.8  # Camera field of view in degrees
+mavlink_connection = None  # e.g. "/dev/ttyAMA0", or "tcp:127.0.0.1:5760" for fake_vehicle.py
+baudrate = 57600
+target_rate = 20  # Max LANDING_TARGET messages per second
+stats_every = 100  # Print capture stats every N processed frames
 
 # --- Init ---
-cap = cv2.VideoCapture(0)
-cap.set(3, frame_width)
-cap.set(4, frame_height)
+if frame_ring_name:
+    capture = RingCapture(frame_ring_name).start()
+else:
+    capture = LatestFrameCapture(video_source, frame_width, frame_height).start()
+if adaptive_color:
+    detector = AdaptivePadDetector(landing_color, tracking=tracking, coarse_scale=coarse_scale)
+else:
+    detector = PadDetector(landing_color, tracking=tracking, coarse_scale=coarse_scale)
+if calibration_file:
+    camera = CameraModel.load(calibration_file)
+else:
+    camera = CameraModel.from_fov(frame_width, frame_height, horizontal_fov, vertical_fov)
+# One model per resolution, built up front: the undistortion tables take too
+# long to build mid-flight without stalling the loop
+cameras = {(camera.width, camera.height): camera}
+coarse_scales = {(frame_width, frame_height): coarse_scale}
+for _, width, height, scale in (altitude_profiles or []):
+    coarse_scales[(width, height)] = scale
+for size in coarse_scales:
+    if size not in cameras:
+        cameras[size] = camera.scaled(*size)
+camera = cameras[(frame_width, frame_height)]
+verifier = FiducialVerifier(fiducial_dictionary) if fiducial_dictionary is not None else None
+tracker = PadTracker() if predictive_tracking else None
+latency = LatencyMeter()
+sender = None
+if mavlink_connection:
+    from dronekit import connect  # Only needed with a vehicle; print/replay runs without dronekit
+
+    vehicle = connect(mavlink_connection, baud=baudrate, wait_ready=False)
+    sender = LandingTargetSender(vehicle, rate_hz=target_rate).start()
+schedule = None
+if altitude_profiles and sender is not None and hasattr(capture, "request_resolution"):
+    schedule = ResolutionSchedule(altitude_profiles)
+processed = 0
+requested_size = (frame_width, frame_height)
 
 while True:
-    ret, frame = cap.read()
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    lower, upper = get_limits(landing_color)
-
-    mask = cv2.inRange(hsv, lower, upper)
-    contours, _ = cv2.findContours(mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    item = capture.read()
+    if item is None:
+        if not capture.running:
+            break
+        continue
+    seq, captured_at, frame = item
+
+    if schedule is not None:
+        profile = schedule.select(vehicle_altitude(vehicle))
+        if (profile.width, profile.height) != requested_size:
+            requested_size = (profile.width, profile.height)
+            capture.request_resolution(*requested_size)
+
+    height, width = frame.shape[:2]
+    if (width, height) != (frame_width, frame_height):
+        # The camera switched resolution: keep the lock and the tracker going
+        # on the new pixel grid instead of searching from scratch
+        sx, sy = width / frame_width, height / frame_height
+        detector.rescale(sx, sy)
+        if tracker is not None:
+            tracker.rescale(sx, sy)
+        if (width, height) not in cameras:
+            cameras[(width, height)] = camera.scaled(width, height)
+        camera = cameras[(width, height)]
+        detector.coarse_scale = coarse_scales.get((width, height), detector.coarse_scale)
+        print(f"Resolution {frame_width}x{frame_height} -> {width}x{height}")
+        frame_width, frame_height = width, height
+
+    detection = detector.detect(frame)
+
+    if verifier is not None and detection is not None:
+        check = verifier.verify(frame, detection)
+        if check is None:
+            # Right color, no marker: not the pad
+            detection = None
+            detector.reset()
+        elif show_view:
+            cv2.polylines(frame, [check.corners.astype(int)], True, (0, 255, 255), 2)
+            cv2.putText(frame, f"id {check.marker_id} yaw {math.degrees(check.yaw):.0f}",
+                        (int(check.corners[0][0]), int(check.corners[0][1]) - 8),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
 
     cx, cy = None, None
 
-    if contours:
-        largest = max(contours, key=cv2.contourArea)
-        area = cv2.contourArea(largest)
-
-        if area > 500:  # Minimum size to consider
-            x, y, w, h = cv2.boundingRect(largest)
-            cx = x + w // 2
-            cy = y + h // 2
+    if detection is not None:
+        cx, cy, x, y, w, h, area = detection
+        if show_view:
             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
             cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
 
-            # --- Landing Logic ---
-            offset_x = cx - frame_width // 2
-            offset_y = cy - frame_height // 2
-
+    if tracker is not None:
+        # Steer on where the pad will be when the command lands, and keep
+        # steering on the prediction through short detection dropouts
+        tracker.update((cx, cy) if detection is not None else None, captured_at)
+        predicted = tracker.predict(time.monotonic() + command_delay)
+        cx, cy = (round(predicted[0]), round(predicted[1])) if predicted is not None else (None, None)
+        if show_view and cx is not None:
+            cv2.circle(frame, (cx, cy), 5, (255, 0, 0), 2)
+
+    if cx is not None:
+        # --- Landing Logic ---
+        offset_x = cx - frame_width // 2
+        offset_y = cy - frame_height // 2
+
+        if sender is not None:
+            # The autopilot's precision landing steers and descends on these
+            angle_x, angle_y = camera.pixel_to_angle(cx, cy)
+            sender.publish(angle_x, angle_y)
+        else:
             print(f"Offset: X={offset_x}, Y={offset_y}")
 
             if abs(offset_x) < tolerance and abs(offset_y) < tolerance:
                 print("Centered. Ready to descend")
-                # send_land_command()  ← Replace with actual MAVLink/DroneKit command
             else:
                 print("Adjusting position...")
-                # send_velocity_command(offset_x, offset_y)
+
+    latency.add(captured_at)
+    processed += 1
+    if processed % stats_every == 0:
+        s = latency.summary()
+        print(f"Frames: captured={capture.captured}, dropped={capture.dropped}, "
+              f"latency mean={s['mean_ms']:.1f} ms, p50={s['p50_ms']:.1f} ms, max={s['max_ms']:.1f} ms, "
+              f"full searches={detector.full_searches}, roi searches={detector.roi_searches}")
+        if getattr(capture, "resolution_switches", 0):
+            losses = capture.switch_losses
+            print(f"Resolution: switches={capture.resolution_switches}, frames lost per switch "
+                  f"last={losses[-1] if losses else 0}, max={max(losses, default=0)}")
+        if verifier is not None:
+            print(f"Fiducial: checked={verifier.checked}, rejected={verifier.rejected} "
+                  f"({verifier.rejection_rate:.0%})")
+        if sender is not None:
+            print(f"LANDING_TARGET: sent={sender.sent}, skipped={sender.skipped}")
+
+    if not show_view:
+        continue
 
     cv2.line(frame, (frame_width//2, 0), (frame_width//2, frame_height), (255, 255, 255), 1)
     cv2.line(frame, (0, frame_height//2), (frame_width, frame_height//2), (255, 255, 255), 1)
@@ -70,5 +176,9 @@ while True:
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
-cap.release()
-cv2.destroyAllWindows()
+capture.stop()
+if sender is not None:
+    sender.stop()
+    vehicle.close()
+if show_view:
+    cv2.destroyAllWindows()
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from pymavlink import mavutil
+
+
+# Streams LANDING_TARGET messages to the autopilot from a background thread.
+# publish() only stores the newest target, so the detector never waits on a
+# slow serial link; the sender thread transmits at most rate_hz messages per
+# second and any target replaced before it was sent is counted as skipped.
+#
+# `vehicle` is either a dronekit Vehicle or a pymavlink connection.
+class LandingTargetSender:
+
+    def __init__(self, vehicle, rate_hz=20, frame=mavutil.mavlink.MAV_FRAME_BODY_NED):
+        self.vehicle = vehicle
+        self.period = 1.0 / rate_hz
+        self.frame = frame
+
+        self.sent = 0
+        self.skipped = 0
+        self.running = False
+
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._target = None
+        self._thread = None
+        self._start_time = time.monotonic()
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def publish(self, angle_x, angle_y, distance=0.0, size_x=0.0, size_y=0.0):
+        with self._lock:
+            if self._target is not None:
+                self.skipped += 1
+            self._target = (angle_x, angle_y, distance, size_x, size_y)
+        self._pending.set()
+
+    def _run(self):
+        next_send = 0.0
+        while self.running:
+            if not self._pending.wait(timeout=0.5):
+                continue
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._lock:
+                target, self._target = self._target, None
+                self._pending.clear()
+            if target is None:
+                continue
+
+            self._send(*target)
+            self.sent += 1
+            next_send = time.monotonic() + self.period
+
+    def _send(self, angle_x, angle_y, distance, size_x, size_y):
+        time_usec = int((time.monotonic() - self._start_time) * 1e6)
+        args = (time_usec, 0, self.frame, angle_x, angle_y, distance, size_x, size_y)
+        if hasattr(self.vehicle, "message_factory"):
+            msg = self.vehicle.message_factory.landing_target_encode(*args)
+            self.vehicle.send_mavlink(msg)
+        else:
+            self.vehicle.mav.landing_target_send(*args)
+
+    def stop(self):
+        self.running = False
+        self._pending.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
@@ -0,0 +1,55 @@
+from collections import namedtuple
+
+import cv2
+
+# Bounding boxes and centroids computed straight from uint8 mask buffers with
+# OpenCV, without copying the mask into another image type.
+
+PadDetection = namedtuple("PadDetection", ["cx", "cy", "x", "y", "w", "h", "area"])
+
+
+def mask_bbox(mask, min_area=0):
+    # (x1, y1, x2, y2) of all non-zero pixels with exclusive x2/y2, like PIL's
+    # getbbox(), or None if the mask has min_area or fewer set pixels
+    if cv2.countNonZero(mask) <= min_area:
+        return None
+    x, y, w, h = cv2.boundingRect(mask)
+    return x, y, x + w, y + h
+
+
+def mask_centroid(mask, min_area=0):
+    # Pixel-weighted (cx, cy) of all non-zero pixels, or None
+    m = cv2.moments(mask, binaryImage=True)
+    if m["m00"] <= min_area:
+        return None
+    return m["m10"] / m["m00"], m["m01"] / m["m00"]
+
+
+def largest_contour(mask, min_area=0, offset=(0, 0)):
+    # (contour, area) of the largest outer contour with area above min_area,
+    # or (None, 0). A hole can never be larger than the blob around it, so
+    # RETR_EXTERNAL finds the same largest contour as RETR_TREE.
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+    if not contours:
+        return None, 0
+
+    largest = max(contours, key=cv2.contourArea)
+    area = cv2.contourArea(largest)
+    if area <= min_area:
+        return None, 0
+    return largest, area
+
+
+def contour_detection(contour, area):
+    # PadDetection for a contour: the center of its bounding box
+    x, y, w, h = cv2.boundingRect(contour)
+    return PadDetection(x + w // 2, y + h // 2, x, y, w, h, area)
+
+
+def largest_blob(mask, min_area=0, offset=(0, 0)):
+    # Largest outer contour with area above min_area as a PadDetection, or
+    # None. offset shifts the result, for ROI masks.
+    contour, area = largest_contour(mask, min_area, offset)
+    if contour is None:
+        return None
+    return contour_detection(contour, area)
@@ -0,0 +1,131 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from frame_capture import LatestFrameCapture
+from frame_ring import FrameRing
+from pad_detector import PadDetector
+
+# Pad detection across several onboard cameras. Capture stays in this process
+# (one LatestFrameCapture thread per camera); each camera gets its own
+# detector process so detection runs on separate cores instead of sharing the
+# GIL. Frames reach the workers through a shared-memory FrameRing and only the
+# small detection results are pickled back, onto one aggregated queue.
+#
+#   service = MultiCameraService({"down": 0, "forward": 1}, [255, 255, 0]).start()
+#   for result in service.results():
+#       ...
+
+CameraDetection = namedtuple("CameraDetection", ["camera", "seq", "captured_at", "detection", "latency"])
+
+
+def _detector_worker(camera, ring_name, color, detector_options, stop, results):
+    ring = FrameRing.attach(ring_name, track=True)
+    reader = ring.reader(copy=False)
+    detector = PadDetector(color, **detector_options)
+    item = frame = None
+    try:
+        while not stop.is_set():
+            item = reader.latest(timeout=0.5)
+            if item is None:
+                continue
+            seq, captured_at, frame = item
+
+            # Detect straight on the shared buffer, then make sure the producer
+            # didn't lap us and overwrite the slot while we were reading it
+            detection = detector.detect(frame)
+            if not reader.still_valid(seq):
+                continue
+            results.put(CameraDetection(camera, seq, captured_at, detection, time.monotonic() - captured_at))
+    finally:
+        item = frame = None  # Views into the ring must go before it closes
+        ring.close()
+
+
+class MultiCameraService:
+
+    def __init__(self, sources, color, width=None, height=None, **detector_options):
+        # sources: {camera name: cv2.VideoCapture source}
+        self.sources = dict(sources)
+        self.color = color
+        self.width = width
+        self.height = height
+        self.detector_options = detector_options
+
+        self.results_queue = mp.Queue()
+        self.stop_event = mp.Event()
+        self.captures = {}
+        self._rings = {}
+        self._workers = []
+        self._feeders = []
+        self.running = False
+
+    def start(self):
+        self.running = True
+        for camera, source in self.sources.items():
+            capture = LatestFrameCapture(source, self.width, self.height).start()
+            first = capture.read(timeout=5)
+            if first is None:
+                capture.stop()
+                raise RuntimeError(f"Camera {camera} ({source}) produced no frames")
+
+            ring = FrameRing.create(first[2].shape, name=None)
+            worker = mp.Process(target=_detector_worker, daemon=True,
+                                args=(camera, ring.name, self.color, self.detector_options,
+                                      self.stop_event, self.results_queue))
+            worker.start()
+            feeder = threading.Thread(target=self._feed, args=(capture, ring, first), daemon=True)
+            feeder.start()
+
+            self.captures[camera] = capture
+            self._rings[camera] = ring
+            self._workers.append(worker)
+            self._feeders.append(feeder)
+        return self
+
+    def _feed(self, capture, ring, item):
+        while self.running and item is not None:
+            seq, captured_at, frame = item
+            ring.publish(frame, captured_at)
+            item = capture.read()
+            while item is None and self.running and capture.running:
+                item = capture.read()
+
+    def results(self, timeout=None):
+        # Aggregated CameraDetection stream from all cameras, in arrival order
+        while self.running:
+            try:
+                yield self.results_queue.get(timeout=timeout if timeout is not None else 0.5)
+            except queue.Empty:
+                if timeout is not None:
+                    return
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        for capture in self.captures.values():
+            capture.stop()
+        for feeder in self._feeders:
+            feeder.join(timeout=2)
+        for worker in self._workers:
+            worker.join(timeout=2)
+            if worker.is_alive():
+                worker.terminate()
+        for ring in self._rings.values():
+            ring.close()
+
+
+if __name__ == "__main__":
+    cameras = {"down": 0, "forward": 1}
+    service = MultiCameraService(cameras, [255, 255, 0], 640, 480).start()
+    try:
+        for result in service.results():
+            if result.detection is not None:
+                print(f"[{result.camera}] pad at ({result.detection.cx}, {result.detection.cy}), "
+                      f"area={result.detection.area:.0f}, latency={result.latency * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
@@ -0,0 +1,73 @@
+import cv2
+
+from color_lut import MultiColorThreshold
+from mask_geometry import PadDetection
+from pad_detector import MIN_AREA
+
+
+# Finds several colored pads in one pass. One HSV conversion labels every
+# configured color, one findContours call on the label image outlines all of
+# them (it treats any non-zero label as foreground) and each contour takes the
+# label of its first boundary pixel. Pads of different colors that touch each
+# other merge into one blob and are reported under one of the two colors.
+class MultiPadDetector:
+
+    def __init__(self, colors, min_area=MIN_AREA):
+        # colors: {name: [B, G, R]}
+        self.names = list(colors)
+        self.threshold = MultiColorThreshold([colors[name] for name in self.names])
+        self.min_area = min_area
+
+    def detect(self, frame):
+        # Returns {name: PadDetection or None} with the largest blob per color
+        labels = self.threshold.mask(frame)
+        contours, _ = cv2.findContours(labels, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        best = [None] * len(self.names)
+        best_area = [self.min_area] * len(self.names)
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            x, y = contour[0][0]
+            i = labels[y, x] - 1
+            if area > best_area[i]:
+                best[i], best_area[i] = contour, area
+
+        detections = {}
+        for name, contour, area in zip(self.names, best, best_area):
+            if contour is None:
+                detections[name] = None
+                continue
+            x, y, w, h = cv2.boundingRect(contour)
+            detections[name] = PadDetection(x + w // 2, y + h // 2, x, y, w, h, area)
+        return detections
+
+
+if __name__ == "__main__":
+    pads = {
+        "cyan": [255, 255, 0],
+        "magenta": [255, 0, 255],
+        "yellow": [0, 255, 255],
+    }
+    box_colors = {name: tuple(int(c) for c in bgr) for name, bgr in pads.items()}
+
+    detector = MultiPadDetector(pads)
+    cap = cv2.VideoCapture(0)
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        for name, detection in detector.detect(frame).items():
+            if detection is None:
+                continue
+            cx, cy, x, y, w, h, area = detection
+            cv2.rectangle(frame, (x, y), (x + w, y + h), box_colors[name], 2)
+            cv2.putText(frame, name, (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, box_colors[name], 1)
+
+        cv2.imshow("Pads", frame)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+    cap.release()
+    cv2.destroyAllWindows()
@@ -0,0 +1,102 @@
+import cv2
+
+from color_lut import ColorThreshold
+from mask_geometry import PadDetection, largest_blob
+
+MIN_AREA = 500  # Minimum contour area (px²) to consider a pad
+
+
+# Finds the landing pad in BGR frames. With tracking on, once the pad has been
+# found the next frame is only searched in a window around the last bounding
+# box; a miss in the window falls back to a full-frame search.
+#
+# With coarse_scale set (e.g. 0.25), full-frame searches threshold a downscaled
+# copy first and only refine candidate regions at full resolution, which keeps
+# high-resolution cameras affordable while the pad is small.
+class PadDetector:
+
+    def __init__(self, color, min_area=MIN_AREA, tracking=True, roi_margin=1.0, min_roi=64,
+                 coarse_scale=None, max_candidates=4):
+        self.color_threshold = ColorThreshold(color)
+        self.min_area = min_area
+        self.tracking = tracking
+        self.roi_margin = roi_margin  # Window padding as a fraction of the pad size
+        self.min_roi = min_roi  # Smallest window side in pixels
+        self.coarse_scale = coarse_scale
+        self.max_candidates = max_candidates
+        self.last = None
+
+        self.full_searches = 0
+        self.roi_searches = 0
+        self.roi_misses = 0
+
+    def roi(self, frame_shape):
+        # Window (x0, y0, x1, y1) around the last detection, clipped to the frame
+        h, w = frame_shape[:2]
+        last = self.last
+        pad_x = max(int(last.w * self.roi_margin), (self.min_roi - last.w) // 2, 0)
+        pad_y = max(int(last.h * self.roi_margin), (self.min_roi - last.h) // 2, 0)
+        x0 = max(last.x - pad_x, 0)
+        y0 = max(last.y - pad_y, 0)
+        x1 = min(last.x + last.w + pad_x, w)
+        y1 = min(last.y + last.h + pad_y, h)
+        return x0, y0, x1, y1
+
+    def search(self, frame, x0=0, y0=0):
+        mask = self.color_threshold.mask(frame)
+        return largest_blob(mask, self.min_area, offset=(x0, y0))
+
+    def coarse_search(self, frame):
+        h, w = frame.shape[:2]
+        scale = self.coarse_scale
+        # Nearest-neighbour keeps pad pixels their true color; area averaging
+        # would blend pad edges with the background and shift their hue
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+        contours, _ = cv2.findContours(self.color_threshold.mask(small), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        # Coarse blobs are judged by their upscaled bounding box; contourArea is
+        # too pessimistic for blobs only a few pixels across
+        boxes = [cv2.boundingRect(c) for c in contours]
+        boxes = [b for b in boxes if b[2] * b[3] / (scale * scale) >= self.min_area / 2]
+        boxes.sort(key=lambda b: b[2] * b[3], reverse=True)
+
+        best = None
+        pad = 1 / scale  # one coarse pixel of slack around each candidate
+        for bx, by, bw, bh in boxes[:self.max_candidates]:
+            x0 = max(int(bx / scale - pad), 0)
+            y0 = max(int(by / scale - pad), 0)
+            x1 = min(int((bx + bw) / scale + pad), w)
+            y1 = min(int((by + bh) / scale + pad), h)
+            detection = self.search(frame[y0:y1, x0:x1], x0, y0)
+            if detection is not None and (best is None or detection.area > best.area):
+                best = detection
+        return best
+
+    def detect(self, frame):
+        if self.tracking and self.last is not None:
+            x0, y0, x1, y1 = self.roi(frame.shape)
+            self.roi_searches += 1
+            detection = self.search(frame[y0:y1, x0:x1], x0, y0)
+            if detection is not None:
+                self.last = detection
+                return detection
+            self.roi_misses += 1
+
+        self.full_searches += 1
+        if self.coarse_scale:
+            self.last = self.coarse_search(frame)
+        else:
+            self.last = self.search(frame)
+        return self.last
+
+    def rescale(self, sx, sy):
+        # Carry the lock over when the capture resolution changes, so the next
+        # frame is still a window search instead of a full-frame one
+        if self.last is None:
+            return
+        cx, cy, x, y, w, h, area = self.last
+        self.last = PadDetection(round(cx * sx), round(cy * sy), round(x * sx), round(y * sy),
+                                 max(round(w * sx), 1), max(round(h * sy), 1), area * sx * sy)
+
+    def reset(self):
+        self.last = None
@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+
+
+# Constant-velocity Kalman filter over the pad centroid. update() folds in a
+# measurement (or a miss) stamped with its capture time; predict() extrapolates
+# to a later time, e.g. when the command will actually reach the autopilot, so
+# pipeline latency is compensated. Through short dropouts the tracker keeps
+# predicting for up to max_coast seconds before reporting the pad as lost.
+#
+# State is [x, y, vx, vy] in pixels and pixels/second.
+class PadTracker:
+
+    def __init__(self, process_noise=2000.0, measurement_noise=4.0, max_coast=0.5):
+        self.process_noise = process_noise  # Acceleration variance, (px/s²)²
+        self.max_coast = max_coast
+
+        self.kf = cv2.KalmanFilter(4, 2, 0, cv2.CV_64F)
+        self.kf.measurementMatrix = np.array([[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float64)
+        self.kf.measurementNoiseCov = np.eye(2) * measurement_noise
+
+        self._measurement = np.zeros((2, 1))
+        self.initialized = False
+        self.state_time = 0.0
+        self.last_seen = 0.0
+
+    def _advance(self, t):
+        dt = max(t - self.state_time, 0.0)
+        self.kf.transitionMatrix = np.array([[1, 0, dt, 0],
+                                             [0, 1, 0, dt],
+                                             [0, 0, 1, 0],
+                                             [0, 0, 0, 1]], dtype=np.float64)
+        # Discretised white-noise acceleration
+        q = self.process_noise
+        a, b, c = q * dt ** 3 / 3, q * dt ** 2 / 2, q * dt
+        self.kf.processNoiseCov = np.array([[a, 0, b, 0],
+                                            [0, a, 0, b],
+                                            [b, 0, c, 0],
+                                            [0, b, 0, c]], dtype=np.float64)
+        self.kf.predict()
+        self.state_time = t
+
+    def update(self, measurement, t):
+        # measurement: (cx, cy) or None when the detector missed this frame
+        if measurement is None:
+            if self.initialized:
+                self._advance(t)
+                # Nothing to correct with: carry the prediction forward
+                self.kf.statePost = self.kf.statePre.copy()
+                self.kf.errorCovPost = self.kf.errorCovPre.copy()
+                if t - self.last_seen > self.max_coast:
+                    self.reset()
+            return
+
+        self._measurement[0, 0], self._measurement[1, 0] = measurement
+        if not self.initialized:
+            self.kf.statePost = np.array([[measurement[0]], [measurement[1]], [0.0], [0.0]])
+            self.kf.errorCovPost = np.diag([10.0, 10.0, 1e4, 1e4])
+            self.initialized = True
+            self.state_time = t
+        else:
+            self._advance(t)
+            self.kf.correct(self._measurement)
+        self.last_seen = t
+
+    def predict(self, t):
+        # Pad position (x, y) extrapolated to time t, or None when lost
+        if not self.initialized or t - self.last_seen > self.max_coast:
+            return None
+        x, y, vx, vy = self.kf.statePost[:, 0]
+        dt = t - self.state_time
+        return float(x + vx * dt), float(y + vy * dt)
+
+    def velocity(self):
+        if not self.initialized:
+            return None
+        return float(self.kf.statePost[2, 0]), float(self.kf.statePost[3, 0])
+
+    def rescale(self, sx, sy):
+        # Move the state to a new capture resolution without losing velocity
+        if not self.initialized:
+            return
+        scale = np.diag([sx, sy, sx, sy])
+        self.kf.statePost = scale @ self.kf.statePost
+        self.kf.errorCovPost = scale @ self.kf.errorCovPost @ scale
+
+    def reset(self):
+        self.initialized = False
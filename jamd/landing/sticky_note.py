@@ -1,40 +1,18 @@
 import cv2
-import numpy as np
-from PIL import Image
 
-def get_limits(color):
-    c = np.uint8([[color]])  # BGR values
-    hsvC = cv2.cvtColor(c, cv2.COLOR_BGR2HSV)
-
-    hue = hsvC[0][0][0]  # Get the hue value
-
-    # Handle red hue wrap-around
-    if hue >= 165:  # Upper limit for divided red hue
-        lowerLimit = np.array([hue - 10, 100, 100], dtype=np.uint8)
-        upperLimit = np.array([180, 255, 255], dtype=np.uint8)
-    elif hue <= 15:  # Lower limit for divided red hue
-        lowerLimit = np.array([0, 100, 100], dtype=np.uint8)
-        upperLimit = np.array([hue + 10, 255, 255], dtype=np.uint8)
-    else:
-        lowerLimit = np.array([hue - 10, 100, 100], dtype=np.uint8)
-        upperLimit = np.array([hue + 10, 255, 255], dtype=np.uint8)
-
-    return lowerLimit, upperLimit
+from color_lut import ColorThreshold
+from mask_geometry import mask_bbox
 
 cyan = [255, 255, 0]  # cyan in BGR
+min_area = 0  # Ignore masks with this many pixels or fewer
 cap = cv2.VideoCapture(0)
+threshold = ColorThreshold(cyan)  # or manually set as below
+# threshold = ColorThreshold(limits=[([80, 100, 100], [100, 255, 255])])
 
 while True:
     ret, frame = cap.read()
-    hsvImage = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-
-    lowerLimit, upperLimit = get_limits(color=cyan)  # or manually set as below
-    # lowerLimit = np.array([80, 100, 100])
-    # upperLimit = np.array([100, 255, 255])
-
-    mask = cv2.inRange(hsvImage, lowerLimit, upperLimit)
-    mask_ = Image.fromarray(mask)
-    bbox = mask_.getbbox()
+    mask = threshold.mask(frame)
+    bbox = mask_bbox(mask, min_area=min_area)
 
     if bbox is not None:
         x1, y1, x2, y2 = bbox
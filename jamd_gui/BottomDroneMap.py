@@ -4,9 +4,22 @@ import webbrowser
 import time
 import os
 
+from map_routes import ORDER_SCRIPT, STATS_SCRIPT, STATS_STYLE, add_order_route, add_stats_route
+from mission import click_mission
+from mission_simplify import simplify
+from mission_stats import describe, mission_stats
+from survey import survey_coords, survey_mission
+from waypoint_file import write_waypoints
+
 app = Flask(__name__)
 
+SIMPLIFY_TOLERANCE = None  # Metres; e.g. 1.0 to drop clicked waypoints that barely change the path
+BATTERY_MINUTES = 15  # Usable flight time on a full pack, for the estimate shown on the map
+SURVEY_SWATH = 10.0  # Metres of ground one survey pass covers
+SURVEY_OVERLAP = 0.2  # Fraction shared by neighbouring passes
+
 saved_coords = []
+survey_area = False  # Clicked points are the corners of an area to survey
 phase = 1
 
 @app.route('/')
@@ -28,11 +41,27 @@ def index():
                 color: white; border: none; border-radius: 5px;
                 cursor: pointer; z-index: 9999;
             }
+            #surveyBtn {
+                position: fixed; top: 55px; right: 10px;
+                padding: 10px; background-color: #007bff;
+                color: white; border: none; border-radius: 5px;
+                cursor: pointer; z-index: 9999;
+            }
+            #orderBtn {
+                position: fixed; top: 100px; right: 10px;
+                padding: 10px; background-color: #6f42c1;
+                color: white; border: none; border-radius: 5px;
+                cursor: pointer; z-index: 9999;
+            }
+            {{ stats_style|safe }}
         </style>
     </head>
     <body>
         <div id="map"></div>
         <button id="finishBtn" onclick="finish()">Finish</button>
+        <button id="surveyBtn" onclick="survey()">Survey area</button>
+        <button id="orderBtn" onclick="optimizeOrder()">Optimize order</button>
+        <div id="stats">No waypoints yet</div>
         <script>
             var map = L.map('map').setView([42.384187, -71.066847], 40);
             L.tileLayer('https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}', {
@@ -43,6 +72,12 @@ def index():
             var points = [];
             var markers = [];
             var polyline = L.polyline(points, {color: 'blue'}).addTo(map);
+            var surveyLine = L.polyline([], {color: 'lime'}).addTo(map);
+            var surveying = false;
+
+            function updateMarkerPopup(marker, index) {
+                marker.bindPopup("Waypoint " + (index + 1) + "<br>Lat: " + points[index][0] + "<br>Lon: " + points[index][1]);
+            }
 
             map.on('click', function(e) {
                 var lat = e.latlng.lat.toFixed(6);
@@ -51,14 +86,32 @@ def index():
                 polyline.setLatLngs(points);
                 var marker = L.marker(e.latlng).addTo(map);
                 markers.push(marker);
-                marker.bindPopup("Waypoint " + points.length + "<br>Lat: " + lat + "<br>Lon: " + lon).openPopup();
+                updateMarkerPopup(marker, markers.length - 1);
+                marker.openPopup();
                 fetch('/save_coords', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({ lat: lat, lon: lon })
-                });
+                }).then(surveying ? survey : refreshStats);
             });
 
+            {{ stats_script|safe }}
+
+            function survey() {
+                fetch('/survey', {method: 'POST'}).then(r => r.json()).then(s => {
+                    if (s.status !== 'ok') {
+                        alert(s.message);
+                        return;
+                    }
+                    surveying = true;
+                    polyline.setLatLngs(points.concat([points[0]]));
+                    surveyLine.setLatLngs(s.path);
+                    refreshStats();
+                });
+            }
+
+            {{ order_script|safe }}
+
             function finish() {
                 fetch('/finish', {method: 'POST'}).then(() => {
                     alert("Finished! You can close the browser and check PyCharm.");
@@ -67,7 +120,7 @@ def index():
         </script>
     </body>
     </html>
-    ''', phase=phase)
+    ''', stats_style=STATS_STYLE, stats_script=STATS_SCRIPT, order_script=ORDER_SCRIPT, phase=phase)
 
 @app.route('/save_coords', methods=['POST'])
 def save_coords():
@@ -78,20 +131,32 @@ def save_coords():
     print(f"[\u2713] Saved: ({lat}, {lon})")
     return jsonify(status='ok')
 
+@app.route('/survey', methods=['POST'])
+def start_survey():
+    # Fly a lawnmower pattern over the clicked area instead of the clicked path
+    global survey_area
+    if len(saved_coords) < 3:
+        return jsonify(status='error', message='Click at least 3 corners of the area first'), 400
+    survey_area = True
+    return jsonify(status='ok', path=survey_coords(saved_coords, SURVEY_SWATH, SURVEY_OVERLAP).tolist())
+
 @app.route('/finish', methods=['POST'])
 def finish():
     threading.Thread(target=complete_after_map).start()
     return jsonify(done=True)
 
-def create_waypoint_file(filename, waypoints):
-    header = "QGC WPL 110\n"
-    with open(filename, 'w') as file:
-        file.write(header)
-        for wp in waypoints:
-            line = f"{wp['seq']}\t{wp['current']}\t{wp['frame']}\t{wp['command']}\t"
-            line += f"{wp['param1']:.8f}\t{wp['param2']:.8f}\t{wp['param3']:.8f}\t{wp['param4']:.8f}\t"
-            line += f"{wp['latitude']:.8f}\t{wp['longitude']:.8f}\t{wp['altitude']:.6f}\t1\n"
-            file.write(line)
+def build_mission():
+    if survey_area:
+        mission = survey_mission(saved_coords, SURVEY_SWATH, SURVEY_OVERLAP, alt=4, takeoff_alt=3.0)
+    else:
+        mission = click_mission(saved_coords, takeoff_alt=3.0, cruise_alt=4)
+    if SIMPLIFY_TOLERANCE:
+        mission = simplify(mission, SIMPLIFY_TOLERANCE)
+    return mission
+
+add_stats_route(app, saved_coords, build_mission, BATTERY_MINUTES)
+add_order_route(app, saved_coords,
+                refusal=lambda: 'A survey already flies the shortest pattern' if survey_area else None)
 
 def complete_after_map():
     global phase, saved_coords
@@ -105,26 +170,10 @@ def complete_after_map():
     for i, (lat, lon) in enumerate(saved_coords, 1):
         print(f"coord{i} = ({lat}, {lon})")
 
-    waypoints = [
-        {'seq': 0, 'current': 0, 'frame': 3, 'command': 22, 'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
-         'latitude': 0.0, 'longitude': 0.0, 'altitude': 3.0},
-    ]
-
-    seq = 1
-    for i, (lat, lon) in enumerate(saved_coords, start=1):
-        command = 21 if i == len(saved_coords) else 16
-        altitude = 0 if command == 21 else 4
-        waypoints.append({
-            'seq': seq, 'current': 0, 'frame': 3, 'command': command,
-            'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
-            'latitude': lat, 'longitude': lon, 'altitude': altitude
-        })
-        seq += 1
-
-    for idx, wp in enumerate(waypoints):
-        wp['seq'] = idx + 1
-
-    create_waypoint_file("BDWP.waypoints", waypoints)
+    mission = build_mission()
+    print(f"[\u2713] {len(mission)} items, {describe(mission_stats(mission, battery_minutes=BATTERY_MINUTES))}")
+
+    write_waypoints("BDWP.waypoints", mission)
     print("\n[\u2713] Saved 'BDWP.waypoints'")
 
     saved_coords.clear()
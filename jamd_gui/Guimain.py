@@ -3,34 +3,47 @@ import subprocess
 import sys
 import threading
 import time
-from dronekit import connect, VehicleMode, Command
+from dronekit import connect, VehicleMode
 import serial.tools.list_ports
 
+from mission import to_commands
+from mission_cache import load_mission
+from mission_protocol import mission_link, upload_changes
+
 MDWPF = "attemp.waypoints"
 BAUDRATE = 57600
 TIMEOUT = 90
+DIFFERENTIAL_UPLOAD = False  # Re-send only changed items; needs an autopilot link that reports MAVLink 2 opaque_id
 venv_python = sys.executable
+uploaded_missions = {}  # vehicle -> (mission, opaque_id) of the last upload to it
 
 def scan_ports():
     return [port.device for port in serial.tools.list_ports.comports()]
 
 def read_mission(file_path):
-    cmds = []
-    with open(file_path, "r") as f:
-        lines = f.readlines()[1:]  # skip first line
-        for line in lines:
-            vals = line.strip().split('\t')
-            if len(vals) >= 12:
-                cmds.append(Command(0, 0, 0, int(vals[2]), int(vals[3]), 0, 0,
-                                    float(vals[4]), float(vals[5]), float(vals[6]), float(vals[7]),
-                                    float(vals[8]), float(vals[9]), float(vals[10])))
-    return cmds
-
-def upload_mission(vehicle, mission_cmds):
-    vehicle.commands.clear()
-    for cmd in mission_cmds:
-        vehicle.commands.add(cmd)
-    vehicle.commands.upload()
+    # Parsed once per file version, see mission_cache.py
+    return to_commands(load_mission(file_path))
+
+def upload_mission(vehicle, file_path):
+    # Returns an UploadReport for differential uploads, None otherwise
+    if not DIFFERENTIAL_UPLOAD:
+        vehicle.commands.clear()
+        for cmd in read_mission(file_path):
+            vehicle.commands.add(cmd)
+        vehicle.commands.upload()
+        return None
+
+    mission = load_mission(file_path)
+    # Forget the last upload first: if this one fails partway, the vehicle
+    # holds neither mission and the next upload must not diff against either
+    previous, previous_id = uploaded_missions.pop(vehicle, (None, 0))
+    link = mission_link(vehicle)
+    try:
+        report = upload_changes(link, mission, previous, previous_id)
+    finally:
+        link.close()
+    uploaded_missions[vehicle] = (mission, report.opaque_id)
+    return report
 
 def wait_for_mode(vehicle, mode):
     vehicle.mode = VehicleMode(mode)
@@ -404,9 +417,10 @@ class DroneGUI:
                 self.log("No Mother/Main drone connected")
                 return
             try:
-                cmds = read_mission("attemp.waypoints")
-                upload_mission(self.vehicle, cmds)
+                report = upload_mission(self.vehicle, "attemp.waypoints")
                 self.log("Mission uploaded to Mother/Main drone")
+                if report:
+                    self.log(report.summary())
             except Exception as e:
                 self.log(f"Upload failed: {e}")
 
@@ -416,9 +430,10 @@ class DroneGUI:
             self.log("No Top drone connected")
             return
         try:
-            cmds = read_mission("TDWP.waypoints")
-            upload_mission(self.top_vehicle, cmds)
+            report = upload_mission(self.top_vehicle, "TDWP.waypoints")
             self.log("Mission uploaded to Top drone")
+            if report:
+                self.log(report.summary())
         except Exception as e:
             self.log(f"Upload to Top drone failed: {e}")
 
@@ -427,9 +442,10 @@ class DroneGUI:
             self.log("No Bottom drone connected")
             return
         try:
-            cmds = read_mission("BDWP.waypoints")
-            upload_mission(self.bottom_vehicle, cmds)
+            report = upload_mission(self.bottom_vehicle, "BDWP.waypoints")
             self.log("Mission uploaded to Bottom drone")
+            if report:
+                self.log(report.summary())
         except Exception as e:
             self.log(f"Upload to Bottom drone failed: {e}")
 
@@ -438,9 +454,10 @@ class DroneGUI:
             self.log("No drone connected")
             return
         try:
-            cmds = read_mission("model.waypoints")
-            upload_mission(self.vehicle, cmds)
+            report = upload_mission(self.vehicle, "model.waypoints")
             self.log("Model mission uploaded")
+            if report:
+                self.log(report.summary())
         except Exception as e:
             self.log(f"Upload failed: {e}")
 
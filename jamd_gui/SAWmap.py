@@ -5,8 +5,17 @@ import time
 import requests  # for shutdown POST
 import os
 
+from map_routes import ORDER_SCRIPT, STATS_SCRIPT, STATS_STYLE, add_order_route, add_stats_route
+from mission import click_mission, concat, insert_after, servo_release, waypoints
+from mission_simplify import simplify
+from mission_stats import describe, mission_stats
+from waypoint_file import write_waypoints
+
 app = Flask(__name__)
 
+SIMPLIFY_TOLERANCE = None  # Metres; e.g. 1.0 to drop clicked waypoints that barely change the path
+BATTERY_MINUTES = 15  # Usable flight time on a full pack, for the estimate shown on the map
+
 saved_coords = []
 servo_release_index = None
 phase = 1
@@ -42,11 +51,20 @@ def index():
                 cursor: pointer;
                 font-size: 12px;
             }
+            #orderBtn {
+                position: fixed; top: 55px; right: 10px;
+                padding: 10px; background-color: #6f42c1;
+                color: white; border: none; border-radius: 5px;
+                cursor: pointer; z-index: 9999;
+            }
+            {{ stats_style|safe }}
         </style>
     </head>
     <body>
         <div id="map"></div>
         <button id="finishBtn" onclick="finish()">Finish</button>
+        <button id="orderBtn" onclick="optimizeOrder()">Optimize order</button>
+        <div id="stats">No waypoints yet</div>
         <script>
             var map = L.map('map').setView([42.384187, -71.066847], 40);
             L.tileLayer('https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}', {
@@ -90,7 +108,7 @@ def index():
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({index: index})
-                });
+                }).then(refreshStats);
                 markers.forEach((m, i) => {
                     m.setIcon(i === index ? redIcon : defaultIcon);
                 });
@@ -121,9 +139,13 @@ def index():
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({ lat: lat, lon: lon })
-                });
+                }).then(refreshStats);
             });
 
+            {{ stats_script|safe }}
+
+            {{ order_script|safe }}
+
             function finish() {
                 fetch('/finish', {method: 'POST'}).then(() => {
                     alert("Finished! You can close the browser and check PyCharm.");
@@ -132,7 +154,8 @@ def index():
         </script>
     </body>
     </html>
-    ''', phase=phase, servo_release_index=servo_release_index, servo_home=servo_home)
+    ''', stats_style=STATS_STYLE, stats_script=STATS_SCRIPT, order_script=ORDER_SCRIPT,
+       phase=phase, servo_release_index=servo_release_index, servo_home=servo_home)
 
 @app.route('/save_coords', methods=['POST'])
 def save_coords():
@@ -168,15 +191,24 @@ def shutdown():
     func()
     return 'Server shutting down...'
 
-def create_waypoint_file(filename, waypoints):
-    header = "QGC WPL 110\n"
-    with open(filename, 'w') as file:
-        file.write(header)
-        for wp in waypoints:
-            line = f"{wp['seq']}\t{wp['current']}\t{wp['frame']}\t{wp['command']}\t"
-            line += f"{wp['param1']:.8f}\t{wp['param2']:.8f}\t{wp['param3']:.8f}\t{wp['param4']:.8f}\t"
-            line += f"{wp['latitude']:.8f}\t{wp['longitude']:.8f}\t{wp['altitude']:.6f}\t1\n"
-            file.write(line)
+def build_mission():
+    mission = click_mission(saved_coords, takeoff_alt=3.0, cruise_alt=6)
+
+    if servo_release_index is not None:
+        # Trigger the servo at the marked waypoint (row 0 is the takeoff),
+        # still at its altitude, then climb to 6 meters at the same location
+        row = servo_release_index + 1
+        lat, lon, altitude = mission['lat'][row], mission['lon'][row], mission['alt'][row]
+        mission = insert_after(mission, row, concat(servo_release(lat, lon, altitude),
+                                                    waypoints([(lat, lon)], 6.0)))
+
+    if SIMPLIFY_TOLERANCE:
+        mission = simplify(mission, SIMPLIFY_TOLERANCE)
+    return mission
+
+add_stats_route(app, saved_coords, build_mission, BATTERY_MINUTES)
+# The servo release waypoint keeps its place when the order is optimized
+add_order_route(app, saved_coords, fixed=lambda: [] if servo_release_index is None else [servo_release_index])
 
 def complete_after_map():
     global phase, saved_coords, servo_home, servo_release_index
@@ -198,48 +230,10 @@ def complete_after_map():
         servo_home = saved_coords[servo_release_index]
         print(f"\n[✓] Servo will trigger after waypoint {servo_release_index + 1}")
 
-        waypoints1 = [
-            {'seq': 0, 'current': 0, 'frame': 3, 'command': 22, 'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
-             'latitude': 0.0, 'longitude': 0.0, 'altitude': 3.0},
-        ]
-
-        seq = 1
-        inserted_servo = False
-        for i, (lat, lon) in enumerate(saved_coords, start=1):
-            command = 21 if i == len(saved_coords) else 16
-            altitude = 0 if command == 21 else 6  # Fly at 4m normally
-
-
-            waypoints1.append({
-                'seq': seq, 'current': 0, 'frame': 3, 'command': command,
-                'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
-                'latitude': lat, 'longitude': lon, 'altitude': altitude
-            })
-            seq += 1
-
-            if i == servo_release_index + 1 and not inserted_servo:
-                # Trigger servo
-                waypoints1.append({
-                    'seq': seq, 'current': 0, 'frame': 3, 'command': 183,
-                    'param1': 8, 'param2': 1000, 'param3': 0, 'param4': 0,
-                    'latitude': lat, 'longitude': lon, 'altitude': altitude  # still at 4m
-                })
-                seq += 1
-
-                # Climb to 6 meters at same location
-                waypoints1.append({
-                    'seq': seq, 'current': 0, 'frame': 3, 'command': 16,
-                    'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
-                    'latitude': lat, 'longitude': lon, 'altitude': 6.0
-                })
-                seq += 1
-
-                inserted_servo = True
-
-        for idx, wp in enumerate(waypoints1):
-            wp['seq'] = idx + 1
-
-        create_waypoint_file("attemp.waypoints", waypoints1)
+        mission1 = build_mission()
+        print(f"[✓] {len(mission1)} items, {describe(mission_stats(mission1, battery_minutes=BATTERY_MINUTES))}")
+
+        write_waypoints("attemp.waypoints", mission1)
         print("\n[✓] Saved 'attemp.waypoints'")
 
         saved_coords.clear()
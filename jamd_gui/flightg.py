@@ -1,7 +1,10 @@
-from dronekit import connect, VehicleMode, Command
+from dronekit import connect, VehicleMode
 import time
 import serial.tools.list_ports
 
+from mission_protocol import mission_link, upload_items
+from waypoint_file import read_waypoints
+
 DRONE1_WAYPOINT_FILE = "drone1.waypoints"
 DRONE2_WAYPOINT_FILE = "drone2.waypoints"
 SERVO_CHANNEL = 8
@@ -57,31 +60,21 @@ def arm_vehicle_stabilize(vehicle):
     vehicle.channels.overrides['3'] = None
 
 def read_mission(file_path):
-    cmds = []
-    with open(file_path, "r") as f:
-        lines = f.readlines()
-    if not lines[0].strip() == "QGC WPL 110":
-        raise ValueError("Invalid .waypoints file format")
-    for line in lines[1:]:
-        vals = line.strip().split('\t')
-        cmd = Command(
-            0, 0, 0,
-            int(vals[2]), int(vals[3]), 0, 0,
-            float(vals[4]), float(vals[5]), float(vals[6]), float(vals[7]),
-            float(vals[8]), float(vals[9]), float(vals[10])
-        )
-        cmds.append(cmd)
-    return cmds
-
-def upload_mission(vehicle, mission_cmds):
-    print("Clearing existing mission...")
-    vehicle.commands.clear()
-    vehicle.flush()
-    print(f"Uploading mission with {len(mission_cmds)} commands...")
-    for cmd in mission_cmds:
-        vehicle.commands.add(cmd)
-    vehicle.flush()
-    print("Mission upload complete.")
+    return read_waypoints(file_path)
+
+def upload_mission(vehicle, mission):
+    print(f"Uploading mission with {len(mission)} commands...")
+
+    def progress(done, total):
+        print(f"\r Sent {done}/{total} items", end="", flush=True)
+
+    link = mission_link(vehicle)
+    try:
+        stats = upload_items(link, mission, progress=progress)
+    finally:
+        link.close()
+    print(f"\nMission upload complete: {stats.items_per_second:.0f} items/s, "
+          f"{stats.retransmits} retransmitted.")
 
 def start_mission(vehicle):
     print("Switching to AUTO mode...")
@@ -2,9 +2,13 @@ import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk
 import cv2
+import os
+import sys
 import threading
 import requests
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "jamd", "landing"))
+
 class DroneControlGUI:
 
     def __init__(self):
@@ -12,6 +16,7 @@ class DroneControlGUI:
         self.root.title("Drone Management System")
 
         self.stream_url = "http://192.168.1.123:81/stream"  # Update this with actual url
+        self.frame_ring_name = None  # e.g. "jamd_frames" to show frames from frame_publisher.py instead
 
         # Menu
         menubar = tk.Menu(self.root)
@@ -65,6 +70,9 @@ class DroneControlGUI:
         self.telemetry_text.see(tk.END)
 
     def show_video(self):
+        if self.frame_ring_name:
+            self.show_ring_video()
+            return
         try:
             self.cap = cv2.VideoCapture(self.stream_url)
             while self.running:
@@ -81,6 +89,29 @@ class DroneControlGUI:
         except Exception as e:
             self.append_log(f"Error connecting to camera: {e}")
 
+    def show_ring_video(self):
+        # Shares the camera with the landing detector through shared memory;
+        # if the GUI falls behind it simply skips to the newest frame
+        from frame_ring import FrameRing
+
+        try:
+            ring = FrameRing.attach(self.frame_ring_name)
+        except Exception as e:
+            self.append_log(f"Error attaching to frame ring: {e}")
+            return
+        reader = ring.reader()
+        while self.running:
+            item = reader.latest(timeout=1.0)
+            if item is None:
+                self.append_log("Camera feed error...")
+                continue
+            frame = cv2.cvtColor(item[2], cv2.COLOR_BGR2RGB)
+            imgtk = ImageTk.PhotoImage(image=Image.fromarray(frame))
+            self.video_label.imgtk = imgtk
+            self.video_label.configure(image=imgtk)
+        reader = None
+        ring.close()
+
     def on_closing(self):
         self.running = False
         if self.cap:
@@ -0,0 +1,96 @@
+from flask import jsonify
+
+from mission_order import distance_matrix, optimize_order, path_length
+from mission_stats import mission_stats, stats_json
+
+# Routes and page snippets shared by the click-to-plan map servers (SAWmap,
+# TopDroneMap, BottomDroneMap). Each server registers the routes with its own
+# build_mission() and puts the snippets into its page:
+#
+#   add_stats_route(app, saved_coords, build_mission, BATTERY_MINUTES)
+#   add_order_route(app, saved_coords)
+#   render_template_string(..., stats_style=STATS_STYLE, stats_script=STATS_SCRIPT,
+#                          order_script=ORDER_SCRIPT)
+#
+# with {{ stats_style|safe }} in the page's <style> and the scripts in its
+# <script>, next to a <div id="stats">. ORDER_SCRIPT expects the page's
+# `points`, `markers`, `polyline` and an updateMarkerPopup(marker, index).
+
+STATS_STYLE = '''
+            #stats {
+                position: fixed; bottom: 20px; left: 10px;
+                padding: 8px 10px; background-color: #343a40;
+                color: white; border-radius: 5px;
+                font: 13px sans-serif; z-index: 9999;
+            }
+'''.strip()
+
+STATS_SCRIPT = '''
+            function refreshStats() {
+                fetch('/mission_stats').then(r => r.json()).then(s => {
+                    var box = document.getElementById('stats');
+                    if (!s.legs) {
+                        box.textContent = 'No waypoints yet';
+                        return;
+                    }
+                    var minutes = Math.floor(s.flight_time_s / 60);
+                    var seconds = Math.round(s.flight_time_s % 60);
+                    var text = s.distance_m + ' m, climb ' + s.climb_m + ' m, about ' + minutes + ':' +
+                               String(seconds).padStart(2, '0') + ' of flight';
+                    if (s.budget_s !== null) {
+                        text += s.over_budget ? ' - OVER the battery budget' : ' - within the battery budget';
+                    }
+                    box.textContent = text;
+                    box.style.backgroundColor = s.over_budget ? '#dc3545' : '#343a40';
+                });
+            }
+'''.strip()
+
+ORDER_SCRIPT = '''
+            function optimizeOrder() {
+                fetch('/optimize_order', {method: 'POST'}).then(r => r.json()).then(s => {
+                    if (s.status !== 'ok') {
+                        alert(s.message);
+                        return;
+                    }
+                    // Points before the first marker (drone 1's servo release
+                    // in SAWmap's phase 2) are not clicked waypoints
+                    var offset = points.length - markers.length;
+                    points = points.slice(0, offset).concat(s.coords.map(c => [c[0].toFixed(6), c[1].toFixed(6)]));
+                    polyline.setLatLngs(points);
+                    markers.forEach((m, i) => {
+                        m.setLatLng(points[offset + i]);
+                        updateMarkerPopup(m, i);
+                    });
+                    refreshStats();
+                });
+            }
+'''.strip()
+
+
+def add_stats_route(app, saved_coords, build_mission, battery_minutes):
+    # /mission_stats: length and flight time of the mission as clicked so far
+    @app.route('/mission_stats')
+    def get_mission_stats():
+        if not saved_coords:
+            return jsonify(legs=0)
+        return jsonify(stats_json(mission_stats(build_mission(), battery_minutes=battery_minutes)))
+
+
+def add_order_route(app, saved_coords, fixed=lambda: [], refusal=lambda: None):
+    # /optimize_order: shorter flying order for the clicked waypoints. The
+    # first, the last (landing) and the fixed() indices keep their place;
+    # refusal() gives a reason not to reorder, or None
+    @app.route('/optimize_order', methods=['POST'])
+    def reorder_waypoints():
+        reason = refusal()
+        if reason is not None:
+            return jsonify(status='error', message=reason), 400
+        if len(saved_coords) < 4:
+            return jsonify(status='ok', coords=saved_coords)  # Nothing between the first and last to move
+        order = optimize_order(saved_coords, fixed=fixed())
+        distances = distance_matrix(saved_coords)
+        before, after = path_length(distances, range(len(order))), path_length(distances, order)
+        saved_coords[:] = [saved_coords[i] for i in order]
+        print(f"[✓] Reordered waypoints: {before:.0f} m -> {after:.0f} m")
+        return jsonify(status='ok', coords=saved_coords)
@@ -0,0 +1,101 @@
+import numpy as np
+
+# Missions as one NumPy structured array, one row per MAVLink mission item.
+# The map servers build them, the loaders parse into them and only the upload
+# step turns them into dronekit Commands, so a survey with thousands of points
+# is built, sliced and edited with array operations instead of lists of dicts.
+#
+#   mission = click_mission(saved_coords, takeoff_alt=9, cruise_alt=9)
+#   mission = insert_after(mission, 3, servo_release(lat, lon, 6.0))
+#   cmds = to_commands(mission)
+
+MISSION_DTYPE = np.dtype([
+    ("seq", np.int32),
+    ("frame", np.uint8),
+    ("command", np.uint16),
+    ("param1", np.float64),
+    ("param2", np.float64),
+    ("param3", np.float64),
+    ("param4", np.float64),
+    ("lat", np.float64),
+    ("lon", np.float64),
+    ("alt", np.float64),
+])
+
+MAV_FRAME_GLOBAL_RELATIVE_ALT = 3
+MAV_CMD_NAV_WAYPOINT = 16
+MAV_CMD_NAV_LAND = 21
+MAV_CMD_NAV_TAKEOFF = 22
+MAV_CMD_DO_SET_SERVO = 183
+
+SERVO_CHANNEL = 8
+SERVO_RELEASE_PWM = 1000
+
+
+def empty(count=0):
+    mission = np.zeros(count, dtype=MISSION_DTYPE)
+    mission["frame"] = MAV_FRAME_GLOBAL_RELATIVE_ALT
+    return mission
+
+
+def items(command, lat=0.0, lon=0.0, alt=0.0, param1=0.0, param2=0.0, param3=0.0, param4=0.0,
+          frame=MAV_FRAME_GLOBAL_RELATIVE_ALT):
+    # Any argument can be a scalar or an array; they broadcast to one row each
+    columns = np.broadcast_arrays(command, lat, lon, alt, param1, param2, param3, param4, frame)
+    mission = empty(columns[0].size)
+    for name, column in zip(("command", "lat", "lon", "alt", "param1", "param2", "param3", "param4", "frame"),
+                            columns):
+        mission[name] = column.ravel()
+    return renumber(mission)
+
+
+def waypoints(coords, alt, command=MAV_CMD_NAV_WAYPOINT):
+    # coords: (N, 2) lat/lon pairs, e.g. a map server's saved_coords
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    return items(command, coords[:, 0], coords[:, 1], alt)
+
+
+def takeoff(alt):
+    return items(MAV_CMD_NAV_TAKEOFF, alt=alt)
+
+
+def servo_release(lat, lon, alt, channel=SERVO_CHANNEL, pwm=SERVO_RELEASE_PWM):
+    return items(MAV_CMD_DO_SET_SERVO, lat, lon, alt, param1=channel, param2=pwm)
+
+
+def renumber(mission, start=1):
+    # Waypoint files here number their first item 1
+    mission["seq"] = np.arange(start, start + len(mission))
+    return mission
+
+
+def concat(*parts, start=1):
+    return renumber(np.concatenate(parts), start)
+
+
+def insert_after(mission, index, new_items, start=1):
+    return concat(mission[:index + 1], new_items, mission[index + 1:], start=start)
+
+
+def click_mission(coords, takeoff_alt, cruise_alt, land_alt=0.0):
+    # Take off, fly the clicked points in order and land on the last one
+    route = waypoints(coords, cruise_alt)
+    if len(route):
+        route["command"][-1] = MAV_CMD_NAV_LAND
+        route["alt"][-1] = land_alt
+    return concat(takeoff(takeoff_alt), route)
+
+
+def from_rows(rows):
+    # rows: iterable of (frame, command, param1..4, lat, lon, alt)
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, 9)
+    return items(rows[:, 1], rows[:, 6], rows[:, 7], rows[:, 8],
+                 rows[:, 2], rows[:, 3], rows[:, 4], rows[:, 5], rows[:, 0])
+
+
+def to_commands(mission):
+    from dronekit import Command  # Only the upload side needs dronekit
+
+    return [Command(0, 0, 0, int(frame), int(command), 0, 0,
+                    float(p1), float(p2), float(p3), float(p4), float(lat), float(lon), float(alt))
+            for _, frame, command, p1, p2, p3, p4, lat, lon, alt in mission.tolist()]
@@ -0,0 +1,64 @@
+import hashlib
+import os
+
+import numpy as np
+
+from mission import MISSION_DTYPE
+from waypoint_file import read_waypoints
+
+# Parsed missions cached as .npy files named after a hash of the waypoint
+# file's contents. An unchanged file is memory-mapped straight from the cache
+# instead of being parsed again; an edited file hashes differently, so it is
+# parsed and cached on first use. Missions loaded from the cache are
+# read-only; copy one before editing it.
+#
+# The hash also covers FORMAT_VERSION and MISSION_DTYPE, so entries written
+# by an older reader are never served after either changes. Bump
+# FORMAT_VERSION whenever read_waypoints would parse a file differently.
+
+CACHE_DIR = ".mission_cache"
+MAX_ENTRIES = 64
+FORMAT_VERSION = 2
+
+
+def _cache_path(data, cache_dir):
+    key = hashlib.blake2b(data, digest_size=16)
+    key.update(f"{FORMAT_VERSION} {MISSION_DTYPE.descr}".encode())
+    return os.path.join(cache_dir, key.hexdigest() + ".npy")
+
+
+def load_mission(path, cache_dir=None):
+    # cache_dir defaults to a .mission_cache folder next to the waypoint file
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    with open(path, "rb") as f:
+        data = f.read()
+    cached = _cache_path(data, cache_dir)
+
+    try:
+        mission = np.load(cached, mmap_mode="r")
+        os.utime(cached)  # Pruning drops the least recently used entries
+        return mission
+    except (OSError, ValueError):
+        pass  # Not cached yet, or a damaged entry that gets rewritten
+
+    mission = read_waypoints(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    partial = f"{cached}.{os.getpid()}.tmp"
+    with open(partial, "wb") as f:
+        np.save(f, mission)
+    os.replace(partial, cached)  # Readers never see a half-written entry
+    _prune(cache_dir)
+    return mission
+
+
+def _prune(cache_dir, keep=MAX_ENTRIES):
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".npy")]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=os.path.getmtime)
+    for entry in entries[:-keep]:
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
@@ -0,0 +1,73 @@
+import numpy as np
+
+from mission_simplify import local_metres
+
+# Reorders clicked waypoints into a shorter path: nearest neighbour to get a
+# reasonable tour, then 2-opt until no reversal of a stretch of the path
+# makes it shorter. Each 2-opt pass scores every possible reversal at once
+# from the distance matrix, so a few hundred points take milliseconds.
+#
+# The first point (where the vehicle heads after takeoff), the last one
+# (where it lands) and any `fixed` indices such as the servo release keep
+# their place in the sequence; only the points between them move, and never
+# past a fixed one.
+
+
+def distance_matrix(coords):
+    # (N, N) metres between lat/lon points
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    points = local_metres(coords[:, 0], coords[:, 1], np.zeros(len(coords)))[:, :2]
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+
+
+def path_length(distances, order):
+    order = np.asarray(order)
+    return float(distances[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(distances, first, last, inner):
+    # Path first -> inner (greedy) -> last
+    path = [first]
+    remaining = list(inner)
+    while remaining:
+        nearest = int(np.argmin(distances[path[-1], remaining]))
+        path.append(remaining.pop(nearest))
+    path.append(last)
+    return np.array(path)
+
+
+def two_opt(distances, path, max_passes=10000):
+    # Improve a path with fixed ends by reversing path[i:j + 1]; takes the
+    # best reversal each pass
+    path = path.copy()
+    n = len(path)
+    if n < 4:
+        return path
+    i, j = np.triu_indices(n - 1, k=1)
+    i, j = i[i >= 1], j[i >= 1]  # 1 <= i < j <= n - 2
+    for _ in range(max_passes):
+        a, b, c, d = path[i - 1], path[i], path[j], path[j + 1]
+        gain = distances[a, b] + distances[c, d] - distances[a, c] - distances[b, d]
+        best = int(np.argmax(gain))
+        if gain[best] <= 1e-9:
+            break
+        path[i[best]:j[best] + 1] = path[i[best]:j[best] + 1][::-1]
+    return path
+
+
+def optimize_order(coords, fixed=()):
+    # Index order for coords giving a shorter path; index 0, the last index
+    # and every index in `fixed` stay where they are
+    n = len(coords)
+    if n < 4:
+        return np.arange(n)
+    distances = distance_matrix(coords)
+    anchors = sorted({0, n - 1} | {int(k) for k in fixed if 0 <= k < n})
+    order = [0]
+    for first, last in zip(anchors[:-1], anchors[1:]):
+        path = two_opt(distances, nearest_neighbour(distances, first, last, range(first + 1, last)))
+        clicked = np.arange(first, last + 1)
+        if path_length(distances, path) >= path_length(distances, clicked):
+            path = clicked  # Already as short as we can make it
+        order.extend(path[1:].tolist())
+    return np.array(order)
@@ -0,0 +1,415 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+from pymavlink import mavutil
+
+from mission import MAV_CMD_NAV_WAYPOINT, concat, empty, items
+
+# The MAVLink mission protocol spoken directly, so a mission upload only sends
+# what the vehicle doesn't already have. upload_changes() diffs the local
+# mission against the vehicle's and re-sends only the changed span with
+# MISSION_WRITE_PARTIAL_LIST; a full upload is only needed when the number of
+# items changed. The vehicle's mission is `previous`, the mission last
+# uploaded to it, only when the vehicle confirms it still holds exactly that
+# upload: MAVLink 2 autopilots put an opaque_id in MISSION_COUNT and
+# MISSION_ACK that changes with every mission change, whoever made it.
+# Without that confirmation the mission is uploaded in full: downloading the
+# vehicle's mission to diff against costs as much link time as the full
+# upload it would save. The pymavlink dialect used here has no opaque_id,
+# so for now every upload through upload_changes() is a full one.
+#
+# Mission item 0 on the vehicle is home, which ArduPilot keeps for itself and
+# the waypoint files here don't contain. Like dronekit's upload, a home
+# placeholder goes in as item 0 and row i of a mission array as item i + 1,
+# so the file's seq column is the vehicle's item number.
+#
+#   link = mission_link(vehicle)
+#   report = upload_changes(link, load_mission("attemp.waypoints"))
+#   print(report.summary())
+
+MAV = mavutil.mavlink
+LINK_BAUD = 57600
+
+
+def link_seconds(byte_count, baud=LINK_BAUD):
+    return byte_count * 10 / baud  # 8N1: ten bits on the wire per byte
+
+
+class UploadReport(namedtuple("UploadReport", ["mode", "items_sent", "retransmits", "bytes_used", "bytes_full",
+                                               "seconds", "opaque_id"])):
+
+    def summary(self, baud=LINK_BAUD):
+        saved = self.bytes_full - self.bytes_used
+        rate = self.items_sent / self.seconds if self.seconds else 0.0
+        if saved > 0:
+            savings = f"saved {saved} bytes (~{link_seconds(saved, baud):.1f} s at {baud} baud)"
+        elif saved == 0:
+            savings = "nothing saved"
+        else:
+            savings = f"{-saved} bytes more than a full upload"
+        return (f"{self.mode} upload: {self.items_sent} items ({rate:.0f}/s, {self.retransmits} retransmitted), "
+                f"{self.bytes_used} bytes on the link vs {self.bytes_full} for a full upload; {savings}, "
+                f"took {self.seconds:.1f} s")
+
+
+class MissionProtocolError(RuntimeError):
+    pass
+
+
+# Sends and receives mission messages over a pymavlink connection, counting
+# the bytes both ways
+class MavlinkLink:
+
+    MESSAGE_TYPES = ["MISSION_COUNT", "MISSION_ITEM_INT", "MISSION_ITEM", "MISSION_REQUEST_INT",
+                     "MISSION_REQUEST", "MISSION_ACK"]
+
+    def __init__(self, connection, target_system=None, target_component=None):
+        self.connection = connection
+        self.mav = connection.mav
+        self.target_system = target_system if target_system is not None else connection.target_system
+        self.target_component = target_component if target_component is not None else connection.target_component
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def send(self, name, *args):
+        self.send_message(getattr(self.mav, name + "_encode")(self.target_system, self.target_component, *args))
+
+    def send_message(self, msg):
+        self._send(msg)
+        self.bytes_sent += len(msg.get_msgbuf())
+
+    def _send(self, msg):
+        self.mav.send(msg)
+
+    def recv(self, timeout):
+        msg = self.connection.recv_match(type=self.MESSAGE_TYPES, blocking=True, timeout=timeout)
+        if msg is not None:
+            self.bytes_received += len(msg.get_msgbuf())
+        return msg
+
+    def close(self):
+        pass
+
+
+# Same for a dronekit Vehicle. dronekit owns the connection's read loop, so
+# mission messages are collected with message listeners instead
+class DronekitLink(MavlinkLink):
+
+    def __init__(self, vehicle):
+        master = vehicle._master
+        self.vehicle = vehicle
+        self.mav = vehicle.message_factory
+        self.target_system = master.target_system
+        self.target_component = master.target_component
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._messages = queue.Queue()
+        for name in self.MESSAGE_TYPES:
+            vehicle.add_message_listener(name, self._on_message)
+
+    def _on_message(self, vehicle, name, msg):
+        self._messages.put(msg)
+
+    def _send(self, msg):
+        self.vehicle.send_mavlink(msg)
+
+    def recv(self, timeout):
+        try:
+            msg = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.bytes_received += len(msg.get_msgbuf())
+        return msg
+
+    def close(self):
+        for name in self.MESSAGE_TYPES:
+            self.vehicle.remove_message_listener(name, self._on_message)
+
+
+def mission_link(vehicle):
+    if hasattr(vehicle, "message_factory"):
+        return DronekitLink(vehicle)
+    return MavlinkLink(vehicle)
+
+
+def with_home(mission):
+    # The vehicle's items for a mission: a home placeholder as item 0 (the
+    # autopilot fills in its own home), then the rows as items 1..n
+    return concat(items(MAV_CMD_NAV_WAYPOINT, frame=0), mission, start=0)
+
+
+def _expect(link, types, timeout, retries, resend):
+    # Next message of one of `types`, calling resend() after each timeout
+    for _ in range(retries + 1):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            msg = link.recv(remaining)
+            if msg is not None and msg.get_type() in types:
+                return msg
+        resend()
+    raise MissionProtocolError(f"No {'/'.join(types)} from the vehicle after {retries + 1} tries")
+
+
+def read_count(link, timeout=1.0, retries=3):
+    # (number of items including home, opaque_id or 0 when not sent)
+    request = lambda: link.send("mission_request_list")
+    request()
+    msg = _expect(link, ["MISSION_COUNT"], timeout, retries, request)
+    return msg.count, getattr(msg, "opaque_id", 0)
+
+
+def download_mission(link, count=None, timeout=1.0, retries=3):
+    # The vehicle's mission as a mission array, without the home item: row i
+    # is item i + 1. count includes home, as read_count() returns it
+    if count is None:
+        count, _ = read_count(link, timeout, retries)
+    mission = empty(max(count - 1, 0))
+    for seq in range(1, count):
+        request = lambda: link.send("mission_request_int", seq)
+        request()
+        while True:
+            item = _expect(link, ["MISSION_ITEM_INT", "MISSION_ITEM"], timeout, retries, request)
+            if item.seq == seq:
+                break
+        scale = 1e-7 if item.get_type() == "MISSION_ITEM_INT" else 1.0
+        mission[seq - 1] = (seq, item.frame, item.command, item.param1, item.param2, item.param3, item.param4,
+                            item.x * scale, item.y * scale, item.z)
+    link.send("mission_ack", MAV.MAV_MISSION_ACCEPTED)
+    return mission
+
+
+def _as_sent(mission):
+    # The mission the way the vehicle stores it: 1e-7 degree lat/lon, float32
+    # params and altitude, so an unchanged item compares equal after a round trip
+    sent = np.zeros(len(mission), dtype=[("frame", np.uint8), ("command", np.uint16),
+                                         ("params", np.float32, 4), ("lat", np.int32), ("lon", np.int32),
+                                         ("alt", np.float32)])
+    sent["frame"] = mission["frame"]
+    sent["command"] = mission["command"]
+    sent["params"] = np.stack([mission["param1"], mission["param2"], mission["param3"], mission["param4"]], axis=1)
+    sent["lat"] = np.round(mission["lat"] * 1e7)
+    sent["lon"] = np.round(mission["lon"] * 1e7)
+    sent["alt"] = mission["alt"]
+    return sent
+
+
+def changed_items(local, remote):
+    # Rows that differ, for two missions of the same length. Neither holds
+    # the home item, so every row is a real change, takeoff included
+    a, b = _as_sent(local), _as_sent(remote)
+    differs = a[["frame", "command", "lat", "lon", "alt"]] != b[["frame", "command", "lat", "lon", "alt"]]
+    differs |= (a["params"] != b["params"]).any(axis=1)
+    return np.flatnonzero(differs)
+
+
+def _item_args(mission, seq):
+    _, frame, command, p1, p2, p3, p4, lat, lon, alt = mission[seq].tolist()
+    return (seq, frame, command, 0, 1, p1, p2, p3, p4,
+            int(round(lat * 1e7)), int(round(lon * 1e7)), alt)
+
+
+class TransferStats(namedtuple("TransferStats", ["items", "retransmits", "bytes_sent", "bytes_received", "seconds"])):
+
+    @property
+    def items_per_second(self):
+        return self.items / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return (self.bytes_sent + self.bytes_received) / self.seconds if self.seconds else 0.0
+
+
+# Uploads mission items with MISSION_ITEM_INT, answering each MISSION_REQUEST
+# the moment it arrives from item messages encoded up front. When the link
+# goes quiet only the item the vehicle last asked for is sent again (it, or
+# the next request, was lost), never the whole mission. If the vehicle NACKs
+# that retransmission as out of sequence, it already had the item and its
+# request for the next one was lost, so the next item goes out right away
+# instead of waiting for the vehicle to ask again. Duplicate or stale
+# requests are simply answered again.
+#
+# The mission's rows go in as items 1..n behind a home placeholder (see
+# with_home); start and end of a partial write are item numbers, i.e. row + 1.
+# progress(done, total) is called whenever the vehicle moves on to a new item
+# and once more on the final ACK. run() blocks; start() runs the upload on a
+# thread and wait() returns its TransferStats or raises its error.
+class MissionUpload:
+
+    def __init__(self, link, mission, start=0, end=None, timeout=0.25, retries=8, progress=None):
+        # With end set, a partial write of items start..end (inclusive) into a
+        # vehicle mission of the same length; otherwise a full upload
+        mission = with_home(mission)
+        self.link = link
+        self.count = len(mission)
+        self.start_index = start
+        self.end_index = end
+        self.timeout = timeout  # Longest quiet time before retransmitting
+        self.min_timeout = 0.05
+        self.retries = retries  # Give up after retries * timeout seconds without a request
+        self.progress = progress
+        self.retransmits = 0
+        self.opaque_id = 0  # From the final ACK, when the vehicle sends one
+
+        lat = np.round(np.asarray(mission["lat"]) * 1e7).astype(np.int64)
+        lon = np.round(np.asarray(mission["lon"]) * 1e7).astype(np.int64)
+        self._messages = [
+            link.mav.mission_item_int_encode(link.target_system, link.target_component,
+                                             seq, frame, command, 0, 1, p1, p2, p3, p4, x, y, z)
+            for seq, (frame, command, p1, p2, p3, p4, x, y, z) in enumerate(zip(
+                mission["frame"].tolist(), mission["command"].tolist(),
+                mission["param1"].tolist(), mission["param2"].tolist(),
+                mission["param3"].tolist(), mission["param4"].tolist(),
+                lat.tolist(), lon.tolist(), mission["alt"].tolist()))
+        ]
+        self._thread = None
+        self._result = None
+
+    @property
+    def total(self):
+        if self.end_index is None:
+            return self.count
+        return self.end_index - self.start_index + 1
+
+    def _begin(self):
+        if self.end_index is None:
+            self.link.send("mission_count", self.count)
+        else:
+            self.link.send("mission_write_partial_list", self.start_index, self.end_index)
+
+    def _send_item(self, seq):
+        self.link.send_message(self._messages[seq])
+
+    def run(self):
+        link = self.link
+        started = time.monotonic()
+        sent_before, received_before = link.bytes_sent, link.bytes_received
+        first = self.start_index if self.end_index is not None else 0
+        resend = self._begin
+        last_seq = None
+        highest = first - 1
+        pushed = None
+        quiet = 0
+        # Smoothed item-to-next-request round trip; once known, a retransmit
+        # waits a few round trips instead of the full timeout
+        rtt = None
+        sent_at = last_request = time.monotonic()
+
+        self._begin()
+        while True:
+            wait = self.timeout if rtt is None else min(self.timeout, max(self.min_timeout, 4 * rtt))
+            msg = link.recv(wait)
+            kind = msg.get_type() if msg is not None else None
+            if kind in ("MISSION_REQUEST_INT", "MISSION_REQUEST"):
+                seq = msg.seq
+                if not 0 <= seq < self.count:
+                    raise MissionProtocolError(f"Vehicle requested item {seq} of {self.count}")
+                if seq > highest and quiet == 0:
+                    sample = time.monotonic() - sent_at
+                    rtt = sample if rtt is None else 0.875 * rtt + 0.125 * sample
+                self._send_item(seq)
+                sent_at = last_request = time.monotonic()
+                if seq > highest:
+                    highest = seq
+                    if self.progress is not None:
+                        self.progress(seq - first, self.total)
+                last_seq = seq
+                resend = lambda: self._send_item(last_seq)
+                quiet = 0
+            elif kind == "MISSION_ACK":
+                if msg.type == MAV.MAV_MISSION_ACCEPTED:
+                    self.opaque_id = getattr(msg, "opaque_id", 0)
+                    break
+                if msg.type != MAV.MAV_MISSION_INVALID_SEQUENCE:
+                    raise MissionProtocolError(f"Vehicle rejected the mission (MAV_MISSION_RESULT {msg.type})")
+                last = self.end_index if self.end_index is not None else self.count - 1
+                if last_seq is not None and last_seq == highest and highest < last and pushed != highest:
+                    pushed = highest
+                    self._send_item(highest + 1)
+            elif msg is None:
+                quiet += 1
+                if time.monotonic() - last_request > self.retries * self.timeout:
+                    raise MissionProtocolError(f"Vehicle stopped answering after item {last_seq}")
+                self.retransmits += 1
+                resend()
+
+        if self.progress is not None:
+            self.progress(self.total, self.total)
+        return TransferStats(self.total, self.retransmits, link.bytes_sent - sent_before,
+                             link.bytes_received - received_before, time.monotonic() - started)
+
+    def start(self):
+        def _run():
+            try:
+                self._result = self.run()
+            except Exception as e:
+                self._result = e
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+def upload_items(link, mission, start=0, end=None, timeout=0.25, retries=8, progress=None):
+    return MissionUpload(link, mission, start, end, timeout, retries, progress).run()
+
+
+def upload_changes(link, mission, previous=None, previous_id=0, timeout=1.0, retries=3, progress=None):
+    # previous/previous_id: the mission last uploaded to this vehicle and the
+    # opaque_id of that upload (report.opaque_id). They are only used if the
+    # vehicle reports the same opaque_id; otherwise the upload is a full one
+    started = time.monotonic()
+    used_before = link.bytes_sent + link.bytes_received
+    full_bytes = _full_upload_bytes(link, mission)
+
+    remote = None
+    opaque_id = 0
+    if previous is not None and previous_id and len(previous) == len(mission):
+        count, opaque_id = read_count(link, timeout, retries)
+        if count == len(mission) + 1 and opaque_id == previous_id:
+            remote = previous
+
+    stats = None
+    if remote is not None:
+        changed = changed_items(mission, remote)
+        if len(changed) == 0:
+            mode = "no-change"
+        else:
+            mode = "partial"
+            upload = MissionUpload(link, mission, int(changed[0]) + 1, int(changed[-1]) + 1, progress=progress)
+            stats = upload.run()
+            opaque_id = upload.opaque_id
+    else:
+        mode = "full"
+        upload = MissionUpload(link, mission, progress=progress)
+        stats = upload.run()
+        opaque_id = upload.opaque_id
+
+    used = link.bytes_sent + link.bytes_received - used_before
+    return UploadReport(mode, stats.items if stats else 0, stats.retransmits if stats else 0,
+                        used, full_bytes, time.monotonic() - started, opaque_id)
+
+
+def _full_upload_bytes(link, mission):
+    # What a plain full upload would put on the link: MISSION_COUNT, a request
+    # and the item for each mission item, and the final ACK. MAVLink 2 trims
+    # trailing zero bytes, so every message is packed to get its real size
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=link.mav.srcSystem)
+    ts, tc = link.target_system, link.target_component
+    mission = with_home(mission)
+    size = len(mav.mission_count_encode(ts, tc, len(mission)).pack(mav))
+    size += len(mav.mission_ack_encode(ts, tc, MAV.MAV_MISSION_ACCEPTED).pack(mav))
+    for seq in range(len(mission)):
+        size += len(mav.mission_request_int_encode(ts, tc, seq).pack(mav))
+        size += len(mav.mission_item_int_encode(ts, tc, *_item_args(mission, seq)).pack(mav))
+    return size
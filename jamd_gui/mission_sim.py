@@ -0,0 +1,151 @@
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+from pymavlink import mavutil
+
+from mission import click_mission
+from mission_protocol import LINK_BAUD, MavlinkLink, link_seconds, upload_items
+
+# A stand-in autopilot for benchmarking mission transfers without a vehicle.
+# It serves the mission side of MAVLink the way ArduPilot does (requests one
+# item at a time, re-requests when an item doesn't arrive, NACKs items that
+# come out of sequence) over local UDP, and can model the telemetry radio:
+# every message costs its transmit time at `baud`, and each direction drops
+# messages with probability `loss`.
+#
+#   python mission_sim.py --items 500 --loss 0 0.02 0.05
+
+MAV = mavutil.mavlink
+
+
+class SimulatedAutopilot:
+
+    def __init__(self, port=14570, baud=None, loss=0.0, rerequest=0.5, seed=None):
+        self.connection = mavutil.mavlink_connection(f"udpin:127.0.0.1:{port}", source_system=1)
+        self.mav = self.connection.mav
+        self.baud = baud
+        self.loss = loss
+        self.rerequest = rerequest  # Seconds before asking again for a missing item
+        self.random = random.Random(seed)
+
+        self.items = []
+        self.dropped = 0
+        self.running = False
+        self._thread = None
+        self._upload = None  # (new items, next seq, last seq) while receiving
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.connection.close()
+
+    def _on_air(self, size):
+        # Radio transmit time, and whether a message of `size` bytes survives the trip
+        if self.baud:
+            time.sleep(link_seconds(size, self.baud))
+        if self.loss and self.random.random() < self.loss:
+            self.dropped += 1
+            return False
+        return True
+
+    def _send(self, name, *args):
+        msg = getattr(self.mav, name + "_encode")(255, 0, *args)
+        if self._on_air(len(msg.pack(self.mav))):
+            self.mav.send(msg)
+
+    def _run(self):
+        last_request = 0.0
+        while self.running:
+            msg = self.connection.recv_match(blocking=True, timeout=0.05)
+            if msg is None or msg.get_type() == "BAD_DATA":
+                if self._upload is not None and time.monotonic() - last_request > self.rerequest:
+                    self._send("mission_request_int", self._upload[1])
+                    last_request = time.monotonic()
+                continue
+            if not self._on_air(len(msg.get_msgbuf())):
+                continue
+
+            kind = msg.get_type()
+            if kind == "MISSION_REQUEST_LIST":
+                self._send("mission_count", len(self.items))
+            elif kind in ("MISSION_REQUEST_INT", "MISSION_REQUEST"):
+                if msg.seq < len(self.items):
+                    self._send("mission_item_int", *self.items[msg.seq])
+            elif kind == "MISSION_COUNT":
+                self._upload = [[None] * msg.count, 0, msg.count - 1]
+                self._send("mission_request_int", 0)
+                last_request = time.monotonic()
+            elif kind == "MISSION_WRITE_PARTIAL_LIST":
+                self._upload = [list(self.items), msg.start_index, msg.end_index]
+                self._send("mission_request_int", msg.start_index)
+                last_request = time.monotonic()
+            elif kind == "MISSION_ITEM_INT":
+                if self._receive_item(msg):
+                    last_request = time.monotonic()
+            elif kind == "MISSION_ACK":
+                pass
+
+    def _receive_item(self, msg):
+        # True when the item was the one being waited for
+        if self._upload is None:
+            # Our ACK was lost and the sender is retrying its last item
+            self._send("mission_ack", MAV.MAV_MISSION_ACCEPTED)
+            return False
+        items, expected, last = self._upload
+        if msg.seq != expected:
+            self._send("mission_ack", MAV.MAV_MISSION_INVALID_SEQUENCE)
+            return False
+        items[msg.seq] = (msg.seq, msg.frame, msg.command, 0, 1, msg.param1, msg.param2, msg.param3,
+                          msg.param4, msg.x, msg.y, msg.z)
+        if msg.seq < last:
+            self._upload[1] = msg.seq + 1
+            self._send("mission_request_int", msg.seq + 1)
+        else:
+            self.items = items
+            self._upload = None
+            self._send("mission_ack", MAV.MAV_MISSION_ACCEPTED)
+        return True
+
+
+def benchmark(items=500, losses=(0.0, 0.02, 0.05), baud=LINK_BAUD, seed=1):
+    rng = np.random.default_rng(seed)
+    coords = np.c_[42.38 + rng.random(items - 1) * 0.01, -71.06 + rng.random(items - 1) * 0.01]
+    mission = click_mission(coords, takeoff_alt=3, cruise_alt=6)
+
+    for i, loss in enumerate(losses):
+        port = 14570 + i
+        sim = SimulatedAutopilot(port, baud=baud, loss=loss, seed=seed).start()
+        connection = mavutil.mavlink_connection(f"udpout:127.0.0.1:{port}", source_system=255)
+        link = MavlinkLink(connection, target_system=1, target_component=1)
+        try:
+            stats = upload_items(link, mission)
+        finally:
+            sim.stop()
+            connection.close()
+        # Item 0 is home; row i of the mission must be item i + 1
+        ok = len(sim.items) == len(mission) + 1 and sim.items[0][0] == 0 and all(
+            item[0] == row + 1 and item[2] == mission["command"][row] and item[11] == np.float32(mission["alt"][row])
+            for row, item in enumerate(sim.items[1:]))
+        print(f"loss {loss:4.0%}: {stats.items} items in {stats.seconds:.2f} s, "
+              f"{stats.items_per_second:.0f} items/s, {stats.bytes_per_second:.0f} B/s, "
+              f"{stats.retransmits} retransmits, {sim.dropped} messages dropped, "
+              f"{'mission intact' if ok else 'MISSION DIFFERS'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark mission uploads against a simulated autopilot")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0, 0.02, 0.05])
+    parser.add_argument("--baud", type=int, default=LINK_BAUD, help="0 for an unthrottled link")
+    args = parser.parse_args()
+    benchmark(args.items, args.loss, args.baud or None)
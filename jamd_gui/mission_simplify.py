@@ -0,0 +1,76 @@
+import numpy as np
+
+from mission import MAV_CMD_NAV_WAYPOINT, renumber
+
+# Drops clicked waypoints that don't change the flown path by more than a
+# tolerance (Douglas-Peucker). Only runs of plain NAV_WAYPOINT items are
+# simplified: takeoff, servo, land and any other command are always kept, and
+# so are the waypoints on either side of them, so a servo still fires at the
+# point it was marked on. Distances are in metres and include altitude, so a
+# climb or descent in the middle of a straight line is kept too.
+
+EARTH_RADIUS = 6371000.0
+
+
+def local_metres(lat, lon, alt, lat0=None):
+    # (N, 3) east/north/up metres, scaled at latitude lat0 (the points' mean
+    # by default); plenty accurate over the few kilometres a mission covers
+    if lat0 is None:
+        lat0 = np.mean(lat)
+    x = np.radians(lon) * np.cos(np.radians(lat0)) * EARTH_RADIUS
+    y = np.radians(lat) * EARTH_RADIUS
+    return np.stack([x, y, np.asarray(alt, dtype=np.float64)], axis=1)
+
+
+def douglas_peucker(points, tolerance):
+    # Boolean mask of the points to keep; the first and last always are.
+    # Each step measures all points of a segment at once
+    keep = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a, b = points[first], points[last]
+        inner = points[first + 1:last]
+        ab = b - a
+        length2 = ab @ ab
+        if length2 == 0:
+            distances = np.linalg.norm(inner - a, axis=1)
+        else:
+            # Distance to the segment, not the infinite line, so points that
+            # double back past an end are not mistaken for collinear
+            t = np.clip((inner - a) @ ab / length2, 0.0, 1.0)
+            distances = np.linalg.norm(inner - (a + t[:, None] * ab), axis=1)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def simplify(mission, tolerance=1.0):
+    # New mission with redundant waypoints removed, renumbered from the same
+    # first seq; tolerance in metres
+    if len(mission) == 0:
+        return mission.copy()
+    keep = np.ones(len(mission), dtype=bool)
+    is_waypoint = mission["command"] == MAV_CMD_NAV_WAYPOINT
+    if not is_waypoint.any():
+        return mission.copy()
+    # Scaled at the waypoints' latitude; a takeoff item sits at 0, 0
+    points = local_metres(mission["lat"], mission["lon"], mission["alt"], np.mean(mission["lat"][is_waypoint]))
+
+    # Runs of consecutive waypoints, as [start, end) index pairs
+    edges = np.diff(np.concatenate([[0], is_waypoint.astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    for start, end in zip(starts, ends):
+        if end - start > 2:
+            keep[start:end] = douglas_peucker(points[start:end], tolerance)
+
+    return renumber(mission[keep], start=int(mission["seq"][0]))
@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+import numpy as np
+
+from mission import MAV_CMD_NAV_LAND, MAV_CMD_NAV_WAYPOINT
+
+# Length, climb and flight time of a mission before it is uploaded, and
+# whether it fits a battery. All legs are computed at once with NumPy, so
+# the map pages can refresh the numbers after every click even for missions
+# with thousands of points.
+#
+# Only NAV commands move the vehicle; DO commands such as the servo release
+# take no time. A takeoff at 0, 0 (as the map servers write it) climbs in
+# place over the first waypoint. Horizontal and vertical motion overlap, so
+# a leg takes whichever of the two is slower. Defaults are ArduCopter's
+# WPNAV_SPEED, WPNAV_SPEED_UP, WPNAV_SPEED_DN and LAND_SPEED.
+
+EARTH_RADIUS = 6371000.0
+MAV_CMD_NAV_LAST = 95  # NAV commands are numbered below this
+
+MissionStats = namedtuple("MissionStats", ["distance", "climb", "descent", "flight_time", "budget",
+                                           "over_budget", "leg_distances", "leg_times"])
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    # Great-circle metres between arrays of points
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def mission_stats(mission, speed=5.0, climb_rate=2.5, descent_rate=1.5, land_speed=0.5,
+                  battery_minutes=None, reserve=0.2):
+    # speeds in m/s; battery_minutes of usable flight time, of which `reserve`
+    # is kept back for landing and wind
+    nav = mission[mission["command"] < MAV_CMD_NAV_LAST]
+    lat, lon, alt = nav["lat"].copy(), nav["lon"].copy(), nav["alt"].copy()
+    command = nav["command"]
+
+    # Items without a position fly from wherever the vehicle already is
+    placed = (lat != 0) | (lon != 0)
+    if placed.any():
+        index = np.where(placed, np.arange(len(nav)), -1)
+        previous = np.maximum.accumulate(index)
+        first = np.argmax(placed)
+        previous[previous < 0] = first  # Takeoff before the first waypoint climbs over it
+        lat, lon = lat[previous], lon[previous]
+
+    # Start on the ground under the first item
+    lat = np.concatenate([lat[:1], lat])
+    lon = np.concatenate([lon[:1], lon])
+    alt = np.concatenate([[0.0], alt])
+
+    leg_distances = haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    rise = np.diff(alt)
+    descent_speed = np.where(command == MAV_CMD_NAV_LAND, land_speed, descent_rate)
+    vertical_time = np.where(rise > 0, rise / climb_rate, -rise / descent_speed)
+    leg_times = np.maximum(leg_distances / speed, vertical_time)
+    # NAV_WAYPOINT param1 is a hold time at the waypoint
+    leg_times += np.where(command == MAV_CMD_NAV_WAYPOINT, nav["param1"], 0.0)
+
+    flight_time = float(leg_times.sum())
+    budget = battery_minutes * 60 * (1 - reserve) if battery_minutes else None
+    return MissionStats(float(leg_distances.sum()), float(rise[rise > 0].sum()), float(-rise[rise < 0].sum()),
+                        flight_time, budget, budget is not None and flight_time > budget,
+                        leg_distances, leg_times)
+
+
+def stats_json(stats):
+    # What the map pages show
+    return {
+        "legs": int(len(stats.leg_distances)),
+        "distance_m": round(stats.distance, 1),
+        "climb_m": round(stats.climb, 1),
+        "descent_m": round(stats.descent, 1),
+        "flight_time_s": round(stats.flight_time, 1),
+        "budget_s": round(stats.budget, 1) if stats.budget is not None else None,
+        "over_budget": bool(stats.over_budget),
+    }
+
+
+def describe(stats):
+    minutes, seconds = divmod(int(round(stats.flight_time)), 60)
+    text = (f"{stats.distance:.0f} m, climb {stats.climb:.0f} m, descent {stats.descent:.0f} m, "
+            f"about {minutes}:{seconds:02d} of flight")
+    if stats.budget is not None:
+        text += " - OVER the battery budget" if stats.over_budget else " - within the battery budget"
+    return text
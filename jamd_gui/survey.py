@@ -0,0 +1,109 @@
+import argparse
+
+import numpy as np
+
+from mission import click_mission
+from mission_simplify import EARTH_RADIUS, local_metres
+from waypoint_file import write_waypoints
+
+# Back-and-forth ("lawnmower") survey of a polygon. The polygon is projected
+# to local metres and rotated so the scan lines run along its longest edge
+# (fewer, longer passes and fewer turns), then every scan line is clipped
+# against every polygon edge in one array operation. Concave polygons are
+# handled with the even-odd rule: a line that crosses a notch is split into
+# several passes, flown in order. Lines alternate direction, so each pass
+# starts where the previous one ended.
+#
+#   python survey.py 42.3840,-71.0670 42.3850,-71.0670 42.3850,-71.0655 --swath 10 --alt 20
+
+
+def longest_edge_angle(points):
+    # Heading of the polygon's longest edge, in radians from the x (east) axis
+    edges = np.roll(points, -1, axis=0) - points
+    dx, dy = edges[np.argmax(np.hypot(edges[:, 0], edges[:, 1]))]
+    return float(np.arctan2(dy, dx))
+
+
+def scan_segments(points, spacing):
+    # (M, 2, 2) start/end points of the passes across an (N, 2) polygon,
+    # scan lines parallel to the x axis, `spacing` metres apart
+    x1, y1 = points[:, 0], points[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    low, high = y1.min(), y1.max()
+    count = max(int(np.ceil((high - low) / spacing)), 1)
+    # Centre the lines so the margin at both sides is the same
+    y = low + (high - low - (count - 1) * spacing) / 2 + np.arange(count) * spacing
+
+    # Lines x edges: a line crosses an edge when it lies in [y1, y2) of it,
+    # half-open so a line through a vertex is counted once
+    yy = y[:, None]
+    crosses = (y1 <= yy) & (yy < y2) | (y2 <= yy) & (yy < y1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = x1 + (yy - y1) * (x2 - x1) / (y2 - y1)
+    x = np.sort(np.where(crosses, x, np.inf), axis=1)
+
+    # Even-odd pairs of crossings are the inside stretches of each line
+    starts, ends = x[:, 0::2], x[:, 1::2]
+    width = min(starts.shape[1], ends.shape[1])
+    starts, ends = starts[:, :width], ends[:, :width]
+    inside = np.isfinite(ends)
+
+    # Alternate direction line by line
+    flip = (np.arange(count) % 2 == 1)[:, None]
+    starts, ends = np.where(flip, -ends, starts), np.where(flip, -starts, ends)
+    order = np.argsort(np.where(inside, starts, np.inf), axis=1, kind="stable")
+    starts = np.where(flip, -1, 1) * np.take_along_axis(starts, order, axis=1)
+    ends = np.where(flip, -1, 1) * np.take_along_axis(ends, order, axis=1)
+    inside = np.take_along_axis(inside, order, axis=1)
+
+    line_y = np.broadcast_to(yy, starts.shape)[inside]
+    return np.stack([np.stack([starts[inside], line_y], axis=1),
+                     np.stack([ends[inside], line_y], axis=1)], axis=1)
+
+
+def survey_coords(polygon, swath, overlap=0.2, angle=None):
+    # (M, 2) lat/lon waypoints covering the polygon; swath in metres is the
+    # width one pass sees, overlap the fraction shared between neighbouring
+    # passes, angle the scan direction in degrees from east (longest edge
+    # by default)
+    polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    if len(polygon) < 3:
+        raise ValueError("A survey area needs at least 3 corners")
+    if swath <= 0 or not 0 <= overlap < 1:
+        raise ValueError("Swath must be positive and overlap in [0, 1)")
+    lat0 = float(np.mean(polygon[:, 0]))
+    points = local_metres(polygon[:, 0], polygon[:, 1], np.zeros(len(polygon)), lat0)[:, :2]
+    origin = points.mean(axis=0)
+    points = points - origin
+
+    theta = longest_edge_angle(points) if angle is None else np.radians(angle)
+    c, s = np.cos(theta), np.sin(theta)
+    to_scan = np.array([[c, -s], [s, c]])  # Row vectors times this rotate by -theta
+    segments = scan_segments(points @ to_scan, swath * (1 - overlap))
+
+    path = segments.reshape(-1, 2) @ to_scan.T + origin
+    lat = np.degrees(path[:, 1] / EARTH_RADIUS)
+    lon = np.degrees(path[:, 0] / (EARTH_RADIUS * np.cos(np.radians(lat0))))
+    return np.stack([lat, lon], axis=1)
+
+
+def survey_mission(polygon, swath, overlap=0.2, alt=20.0, angle=None, takeoff_alt=None):
+    # Take off, fly the passes at `alt` and land at the end of the last one
+    coords = survey_coords(polygon, swath, overlap, angle)
+    return click_mission(coords, takeoff_alt=alt if takeoff_alt is None else takeoff_alt, cruise_alt=alt)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a lawnmower survey of a polygon as a QGC WPL 110 mission")
+    parser.add_argument("corners", nargs="+", help="polygon corners as lat,lon")
+    parser.add_argument("--swath", type=float, required=True, help="metres covered by one pass")
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--alt", type=float, default=20.0)
+    parser.add_argument("--angle", type=float, default=None, help="degrees from east; longest edge by default")
+    parser.add_argument("--out", default="survey.waypoints")
+    args = parser.parse_args()
+
+    corners = [tuple(float(v) for v in corner.split(",")) for corner in args.corners]
+    mission = survey_mission(corners, args.swath, args.overlap, args.alt, args.angle)
+    write_waypoints(args.out, mission)
+    print(f"[✓] Saved '{args.out}' ({len(mission)} items)")
@@ -0,0 +1,108 @@
+import numpy as np
+
+from mission import from_rows
+
+# QGC WPL 110 waypoint files, the format Mission Planner and QGroundControl
+# read. Rows are tab separated:
+#   seq current frame command param1 param2 param3 param4 lat lon alt autocontinue
+#
+# The reader streams the file, checks every row's field count as it goes and
+# then converts and range-checks all rows at once; errors name the line. The
+# writer formats the whole mission into one string and writes it in one call.
+
+HEADER = "QGC WPL 110"
+COLUMNS = 12
+
+# Mission field and format for each written column, current and autocontinue
+# are always written as 0 and 1
+_WRITE_FORMATS = [("seq", "%d"), (None, "0"), ("frame", "%d"), ("command", "%d"),
+                  ("param1", "%.8f"), ("param2", "%.8f"), ("param3", "%.8f"), ("param4", "%.8f"),
+                  ("lat", "%.8f"), ("lon", "%.8f"), ("alt", "%.6f"), (None, "1")]
+
+# (column, name, min, max, whole numbers only)
+_CHECKS = [
+    (0, "seq", 0, 65535, True),
+    (1, "current", 0, 1, True),
+    (2, "frame", 0, 255, True),
+    (3, "command", 0, 65535, True),
+    (8, "latitude", -90.0, 90.0, False),
+    (9, "longitude", -180.0, 180.0, False),
+    (11, "autocontinue", 0, 1, True),
+]
+
+
+class WaypointFileError(ValueError):
+
+    def __init__(self, path, line_number, message):
+        super().__init__(f"{path}, line {line_number}: {message}")
+        self.path = path
+        self.line_number = line_number
+
+
+def read_waypoints(path):
+    # Mission array (see mission.py) for a QGC WPL 110 file
+    lines = []
+    line_numbers = []
+    with open(path, "r") as f:
+        header = f.readline().strip()
+        if header != HEADER:
+            raise WaypointFileError(path, 1, f"expected '{HEADER}' header, got {header!r}")
+        for line_number, line in enumerate(f, start=2):
+            # Count fields, not tabs: a row with every tab but an empty field
+            # would otherwise shift the following rows into the wrong columns
+            columns = len(line.split())
+            if columns == 0:
+                continue
+            if columns != COLUMNS:
+                raise WaypointFileError(path, line_number, f"expected {COLUMNS} columns, got {columns}")
+            lines.append(line)
+            line_numbers.append(line_number)
+
+    if not lines:
+        return from_rows([])
+    try:
+        table = np.array(" ".join(lines).split(), dtype=np.float64).reshape(-1, COLUMNS)
+    except ValueError:
+        # Find the field that doesn't parse, only on this slow path
+        for line, line_number in zip(lines, line_numbers):
+            for column, field in enumerate(line.split()):
+                try:
+                    np.array(field, dtype=np.float64)
+                except ValueError:
+                    raise WaypointFileError(path, line_number, f"column {column + 1} is not a number: {field!r}")
+        raise
+
+    _check_ranges(path, table, line_numbers)
+    return from_rows(table[:, 2:11])
+
+
+def _check_ranges(path, table, line_numbers):
+    bad = ~np.isfinite(table)
+    if bad.any():
+        row, column = np.argwhere(bad)[0]
+        raise WaypointFileError(path, line_numbers[row], f"column {column + 1} is {table[row, column]}")
+
+    for column, name, low, high, whole in _CHECKS:
+        values = table[:, column]
+        bad = (values < low) | (values > high)
+        if whole:
+            bad |= values != np.floor(values)
+        if bad.any():
+            row = int(np.argmax(bad))
+            kind = "a whole number" if whole else "a value"
+            raise WaypointFileError(path, line_numbers[row], f"{name} {values[row]:g} is not {kind} in [{low}, {high}]")
+
+
+def write_waypoints(path, mission):
+    # Each distinct value of a column is formatted once (params and
+    # altitudes repeat a lot), then the rows are joined in one pass
+    columns = []
+    for field, fmt in _WRITE_FORMATS:
+        if field is None:
+            columns.append([fmt] * len(mission))
+            continue
+        values, index = np.unique(mission[field], return_inverse=True)
+        columns.append(np.array([fmt % v for v in values.tolist()], dtype=object)[index])
+    lines = [HEADER] + ["\t".join(row) for row in zip(*columns)]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")